@@ -1,172 +1,285 @@
 from fastapi import FastAPI, Form, Request
-from fastapi.responses import Response
+from fastapi.exception_handlers import request_validation_exception_handler
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, ORJSONResponse
 from main import GmailAssistant
 from voice_handler import VoiceHandler
 from conversation_ai import ConversationAI
 import os
+import asyncio
 import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional, Dict, Tuple
 from dotenv import load_dotenv
 
 load_dotenv('.env.local')
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+@dataclass(frozen=True)
+class EnvSnapshot:
+    """Environment configuration captured once at import"""
+    twilio_account_sid: Optional[str]
+    twilio_auth_token: Optional[str]
+    twilio_number: Optional[str]
+    openai_api_key: Optional[str]
+    google_project_id: Optional[str]
+    base_url: Optional[str]
+
+_ENV = EnvSnapshot(
+    twilio_account_sid=os.getenv("TWILIO_ACCOUNT_SID"),
+    twilio_auth_token=os.getenv("TWILIO_AUTH_TOKEN"),
+    twilio_number=os.getenv("TWILIO_NUMBER"),
+    openai_api_key=os.getenv("OPENAI_API_KEY"),
+    google_project_id=os.getenv("GOOGLE_PROJECT_ID"),
+    base_url=os.getenv("BASE_URL"),
+)
+
+# Set up logging (LOG_LEVEL=WARNING skips the per-request INFO breadcrumbs)
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Gmail Assistant with Voice Calling")
+async def warmup(voice_handler: VoiceHandler) -> None:
+    """Open the pooled Twilio connection before the first call is placed"""
+    try:
+        client = voice_handler.twilio_client
+        await asyncio.to_thread(client.api.accounts(client.account_sid).fetch)
+        logger.info("✅ Twilio connection warmed up")
+    except Exception as e:
+        logger.warning("⚠️  Twilio warm-up failed: %s", e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the VoiceHandler per worker at startup and close its sessions on shutdown"""
+    # Initialize voice_handler with error handling
+    try:
+        app.state.voice_handler = await asyncio.to_thread(VoiceHandler)
+        logger.info("✅ VoiceHandler initialized successfully")
+    except Exception as e:
+        logger.error("❌ Failed to initialize VoiceHandler: %s", e)
+        app.state.voice_handler = None
+    
+    if app.state.voice_handler:
+        await warmup(app.state.voice_handler)
+    
+    yield
+    
+    if app.state.voice_handler:
+        await app.state.voice_handler.aclose()
+
+app = FastAPI(
+    title="Gmail Assistant with Voice Calling",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+class XMLResponse(Response):
+    """TwiML reply; the handlers already produce encoded bytes, which render() passes through"""
+    media_type = "application/xml"
+
+# Add headers to help with ngrok
+_TWIML_HEADERS = {"ngrok-skip-browser-warning": "true", "Cache-Control": "no-cache"}
+
+# Static TwiML fallbacks, encoded once
+_ERR_UNAVAILABLE = b"<Response><Say>Sorry, service unavailable</Say></Response>"
+_ERR_GENERIC = b"<Response><Say>Sorry, an error occurred</Say></Response>"
+_ERR_READING_EMAILS = b"<Response><Say>Sorry, an error occurred reading emails</Say></Response>"
+
+@app.exception_handler(RequestValidationError)
+async def voice_validation_error(request: Request, exc: RequestValidationError):
+    """Answer malformed Twilio webhooks (e.g. no CallSid) in TwiML; Twilio would speak a 422 as an application error"""
+    path = request.url.path
+    if path == "/voice/status":
+        logger.error("❌ Invalid call status callback: %s", exc.errors())
+        return Response(content="OK", media_type="text/plain")
+    if path.startswith("/voice/"):
+        logger.error("❌ Invalid voice webhook %s: %s", path, exc.errors())
+        return XMLResponse(_ERR_GENERIC)
+    return await request_validation_exception_handler(request, exc)
+
+# Twilio resends the same I-Twilio-Idempotency-Token when it retries a webhook
+_IDEMPOTENCY_TTL = 30.0
+_idempotent_responses: Dict[str, Tuple[float, asyncio.Future]] = {}
+
+@app.middleware("http")
+async def replay_twilio_retries(request: Request, call_next):
+    """Answer retried voice webhooks with the first attempt's TwiML instead of redoing LLM work"""
+    token = request.headers.get("i-twilio-idempotency-token")
+    if token is None or not request.url.path.startswith("/voice/"):
+        return await call_next(request)
+    
+    now = time.monotonic()
+    for key in [k for k, (created, _) in _idempotent_responses.items() if now - created > _IDEMPOTENCY_TTL]:
+        del _idempotent_responses[key]
+    
+    entry = _idempotent_responses.get(token)
+    if entry is not None:
+        # Duplicate: wait for the original attempt (it may still be in flight)
+        cached = await asyncio.shield(entry[1])
+        if cached is not None:
+            status_code, headers, body = cached
+            logger.info("♻️  Replaying cached response for retried webhook %s", request.url.path)
+            return Response(content=body, status_code=status_code, headers=headers)
+        return await call_next(request)
+    
+    future = asyncio.get_running_loop().create_future()
+    _idempotent_responses[token] = (now, future)
+    try:
+        response = await call_next(request)
+        body = b"".join([chunk async for chunk in response.body_iterator])
+    except BaseException:
+        # Let waiting duplicates run normally; nothing worth replaying
+        _idempotent_responses.pop(token, None)
+        future.set_result(None)
+        raise
+    
+    headers = dict(response.headers)
+    future.set_result((response.status_code, headers, body))
+    return Response(content=body, status_code=response.status_code, headers=headers)
+
+# Shared GmailAssistant: OAuth loading and API client setup are too costly per request
+_gmail_assistant = None
+_gmail_assistant_lock = threading.Lock()
 
-# Initialize voice_handler with error handling
-try:
-    voice_handler = VoiceHandler()
-    logger.info("✅ VoiceHandler initialized successfully")
-except Exception as e:
-    logger.error(f"❌ Failed to initialize VoiceHandler: {e}")
-    voice_handler = None
+def get_gmail_assistant() -> GmailAssistant:
+    """Return the process-wide GmailAssistant, creating it on first use"""
+    global _gmail_assistant
+    if _gmail_assistant is None:
+        with _gmail_assistant_lock:
+            if _gmail_assistant is None:
+                _gmail_assistant = GmailAssistant()
+    return _gmail_assistant
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Gmail Assistant with Voice Calling API"}
 
 @app.get('/read-emails')
-def read_emails():
+async def read_emails():
     """REST endpoint to read emails"""
     try:
         logger.info("📧 Received read emails request")
-        gmail_assistant = GmailAssistant()
-        results = gmail_assistant.analyze_inbox(max_emails=5)
+        # Gmail + Vertex calls are blocking, keep them off the event loop
+        gmail_assistant = await asyncio.to_thread(get_gmail_assistant)
+        results = await asyncio.to_thread(gmail_assistant.analyze_inbox, max_emails=5)
         logger.info("✅ Emails read successfully")
         return {"message": "Emails read successfully", "emails": results}
     except Exception as e:
-        logger.error(f"❌ Error reading emails: {e}")
-        logger.exception("Full exception details:")
+        logger.error("❌ Error reading emails: %s", e, exc_info=True)
         return {"error": f"Failed to read emails: {str(e)}"}
 
 # Voice calling endpoints
 @app.post("/make-call")
-def make_call(phone_number: str, test_mode: bool = False):
+async def make_call(request: Request, phone_number: str, test_mode: bool = False):
     """Initiate an outbound call"""
+    voice_handler = request.app.state.voice_handler
     try:
-        logger.info(f"📞 Initiating call to {phone_number}, test_mode={test_mode}")
+        logger.info("📞 Initiating call to %s, test_mode=%s", phone_number, test_mode)
         if not voice_handler:
             logger.error("❌ VoiceHandler not initialized")
             return {"error": "Voice handler not available"}
         
-        call_sid = voice_handler.initiate_call(phone_number, test_mode=test_mode)
-        logger.info(f"✅ Call initiated successfully with SID: {call_sid}")
+        call_sid = await voice_handler.initiate_call(phone_number, test_mode=test_mode)
+        logger.info("✅ Call initiated successfully with SID: %s", call_sid)
         return {"message": "Call initiated successfully", "call_sid": call_sid}
     except Exception as e:
-        logger.error(f"❌ Error in make_call: {e}")
-        logger.exception("Full exception details:")
+        logger.error("❌ Error in make_call: %s", e, exc_info=True)
         return {"error": f"Failed to initiate call: {str(e)}"}
 
-@app.post("/voice/greeting")
-async def voice_greeting(request: Request):
+@app.post("/voice/greeting", response_class=XMLResponse, response_model=None)
+async def voice_greeting(request: Request, CallSid: str = Form(...), From: Optional[str] = Form(None)):
     """Handle the initial voice greeting"""
+    voice_handler = request.app.state.voice_handler
     try:
         logger.info("🎤 Received voice greeting request")
         if not voice_handler:
             logger.error("❌ VoiceHandler not initialized")
-            return Response(content="<Response><Say>Sorry, service unavailable</Say></Response>", media_type="application/xml")
+            return XMLResponse(_ERR_UNAVAILABLE)
         
-        twiml_response = await voice_handler.handle_greeting(request)
+        twiml_response = await voice_handler.handle_greeting(CallSid, From)
         logger.info("✅ Generated TwiML response successfully")
-        response = Response(content=twiml_response, media_type="application/xml")
-        # Add headers to help with ngrok
-        response.headers["ngrok-skip-browser-warning"] = "true"
-        response.headers["Cache-Control"] = "no-cache"
-        return response
+        return XMLResponse(twiml_response, headers=_TWIML_HEADERS)
     except Exception as e:
-        logger.error(f"❌ Error in voice_greeting: {e}")
-        logger.exception("Full exception details:")
-        return Response(content="<Response><Say>Sorry, an error occurred</Say></Response>", media_type="application/xml")
+        logger.error("❌ Error in voice_greeting: %s", e, exc_info=True)
+        return XMLResponse(_ERR_GENERIC)
 
-@app.post("/voice/process_input")
-async def voice_process_input(request: Request):
+@app.post("/voice/process_input", response_class=XMLResponse, response_model=None)
+async def voice_process_input(request: Request, CallSid: str = Form(...), SpeechResult: str = Form("")):
     """Process user voice input"""
+    voice_handler = request.app.state.voice_handler
     try:
         logger.info("🎤 Received voice input processing request")
         if not voice_handler:
             logger.error("❌ VoiceHandler not initialized")
-            return Response(content="<Response><Say>Sorry, service unavailable</Say></Response>", media_type="application/xml")
+            return XMLResponse(_ERR_UNAVAILABLE)
         
-        twiml_response = await voice_handler.process_user_input(request)
+        twiml_response = await voice_handler.process_user_input(CallSid, SpeechResult)
         logger.info("✅ Processed user input successfully")
-        response = Response(content=twiml_response, media_type="application/xml")
-        # Add headers to help with ngrok
-        response.headers["ngrok-skip-browser-warning"] = "true"
-        response.headers["Cache-Control"] = "no-cache"
-        return response
+        return XMLResponse(twiml_response, headers=_TWIML_HEADERS)
     except Exception as e:
-        logger.error(f"❌ Error in voice_process_input: {e}")
-        logger.exception("Full exception details:")
-        return Response(content="<Response><Say>Sorry, an error occurred</Say></Response>", media_type="application/xml")
+        logger.error("❌ Error in voice_process_input: %s", e, exc_info=True)
+        return XMLResponse(_ERR_GENERIC)
 
-@app.post("/voice/read_email")
-async def voice_read_email(request: Request):
+@app.post("/voice/read_email", response_class=XMLResponse, response_model=None)
+async def voice_read_email(request: Request, CallSid: str = Form(...)):
     """Read current email to user"""
+    voice_handler = request.app.state.voice_handler
     try:
         logger.info("📧 Received read email request")
         if not voice_handler:
             logger.error("❌ VoiceHandler not initialized")
-            return Response(content="<Response><Say>Sorry, service unavailable</Say></Response>", media_type="application/xml")
+            return XMLResponse(_ERR_UNAVAILABLE)
         
-        twiml_response = await voice_handler.read_current_email(request)
+        twiml_response = await voice_handler.read_current_email(CallSid)
         logger.info("✅ Generated email reading response successfully")
-        response = Response(content=twiml_response, media_type="application/xml")
-        # Add headers to help with ngrok
-        response.headers["ngrok-skip-browser-warning"] = "true"
-        response.headers["Cache-Control"] = "no-cache"
-        return response
+        return XMLResponse(twiml_response, headers=_TWIML_HEADERS)
     except Exception as e:
-        logger.error(f"❌ Error in voice_read_email: {e}")
-        logger.exception("Full exception details:")
-        return Response(content="<Response><Say>Sorry, an error occurred reading emails</Say></Response>", media_type="application/xml")
+        logger.error("❌ Error in voice_read_email: %s", e, exc_info=True)
+        return XMLResponse(_ERR_READING_EMAILS)
 
 @app.post("/voice/status")
-async def voice_call_status(request: Request):
+async def voice_call_status(request: Request, CallSid: str = Form(...), CallStatus: Optional[str] = Form(None)):
     """Handle call status updates"""
+    voice_handler = request.app.state.voice_handler
     try:
         logger.info("📊 Received call status update")
         if not voice_handler:
             logger.error("❌ VoiceHandler not initialized")
             return Response(content="OK", media_type="text/plain")
         
-        result = await voice_handler.handle_call_status(request)
+        result = await voice_handler.handle_call_status(CallSid, CallStatus)
         logger.info("✅ Processed call status successfully")
-        response = Response(content=result, media_type="text/plain")
-        # Add headers to help with ngrok
-        response.headers["ngrok-skip-browser-warning"] = "true"
-        response.headers["Cache-Control"] = "no-cache"
-        return response
+        return Response(content=result, media_type="text/plain", headers=_TWIML_HEADERS)
     except Exception as e:
-        logger.error(f"❌ Error in voice_call_status: {e}")
-        logger.exception("Full exception details:")
+        logger.error("❌ Error in voice_call_status: %s", e, exc_info=True)
         return Response(content="OK", media_type="text/plain")
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "gmail-assistant-voice"}
 
 @app.get("/debug")
-def debug_status():
+async def debug_status(request: Request):
     """Debug endpoint to check component status"""
+    voice_handler = request.app.state.voice_handler
     try:
         status = {
             "voice_handler": "initialized" if voice_handler else "not_initialized",
             "environment_variables": {
-                "TWILIO_ACCOUNT_SID": "set" if os.getenv("TWILIO_ACCOUNT_SID") else "missing",
-                "TWILIO_AUTH_TOKEN": "set" if os.getenv("TWILIO_AUTH_TOKEN") else "missing",
-                "TWILIO_NUMBER": "set" if os.getenv("TWILIO_NUMBER") else "missing",
-                "OPENAI_API_KEY": "set" if os.getenv("OPENAI_API_KEY") else "missing",
-                "GOOGLE_PROJECT_ID": "set" if os.getenv("GOOGLE_PROJECT_ID") else "missing",
-                "BASE_URL": os.getenv("BASE_URL", "not_set"),
+                "TWILIO_ACCOUNT_SID": "set" if _ENV.twilio_account_sid else "missing",
+                "TWILIO_AUTH_TOKEN": "set" if _ENV.twilio_auth_token else "missing",
+                "TWILIO_NUMBER": "set" if _ENV.twilio_number else "missing",
+                "OPENAI_API_KEY": "set" if _ENV.openai_api_key else "missing",
+                "GOOGLE_PROJECT_ID": "set" if _ENV.google_project_id else "missing",
+                "BASE_URL": _ENV.base_url if _ENV.base_url is not None else "not_set",
             }
         }
         
         # Test GmailAssistant initialization
         try:
-            gmail_assistant = GmailAssistant()
+            gmail_assistant = await asyncio.to_thread(get_gmail_assistant)
             status["gmail_assistant"] = "initialized"
         except Exception as e:
             status["gmail_assistant"] = f"failed: {str(e)}"
@@ -180,12 +293,15 @@ def debug_status():
         
         return status
     except Exception as e:
-        logger.error(f"❌ Error in debug endpoint: {e}")
+        logger.error("❌ Error in debug endpoint: %s", e)
         return {"error": str(e)}
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Call sessions live in process memory, so extra workers need sticky routing per CallSid
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    # loop/http "auto" pick uvloop and httptools when they are installed
+    uvicorn.run("app:app", host="0.0.0.0", port=8000, workers=workers, loop="auto", http="auto")
 
 
 
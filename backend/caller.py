@@ -1,18 +1,42 @@
 import os
-import requests
+import asyncio
+import httpx
+from typing import List, Optional
 from twilio.rest import Client
 from dotenv import load_dotenv
 
 load_dotenv('.env.local')
 
-def make_interactive_call(phone_number: str, test_mode: bool = False):
-    """Make an interactive call using the new voice system"""
+# Webhook URLs are fixed for the process lifetime, so build them once
+_BASE_URL = os.environ.get("BASE_URL", "http://localhost:8000")
+# Add ngrok-skip-browser-warning parameter for free ngrok accounts
+_URL_SUFFIX = "?ngrok-skip-browser-warning=true" if 'ngrok' in _BASE_URL else ""
+_TWIML_URL = f"{_BASE_URL}/voice/greeting{_URL_SUFFIX}"
+_STATUS_URL = f"{_BASE_URL}/voice/status{_URL_SUFFIX}"
+_TEST_TWIML_URL = "http://demo.twilio.com/docs/voice.xml"
+
+# Shared keep-alive client so repeated calls reuse the same connection
+_CLIENT = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    timeout=30.0
+)
+
+async def close_client():
+    """Close the shared HTTP client"""
+    await _CLIENT.aclose()
+
+async def make_interactive_call(phone_number: str, test_mode: bool = False,
+                                client: Optional[httpx.AsyncClient] = None):
+    """Make an interactive call using the new voice system
+    
+    Pass client to reuse a caller-owned connection pool (defaults to the shared one).
+    """
+    client = client or _CLIENT
     
     # First option: Use the FastAPI endpoint
     try:
-        base_url = os.environ.get("BASE_URL", "http://localhost:8000")
-        response = requests.post(f"{base_url}/make-call", 
-                               params={"phone_number": phone_number, "test_mode": test_mode})
+        response = await client.post(f"{_BASE_URL}/make-call",
+                                      params={"phone_number": phone_number, "test_mode": test_mode})
         
         if response.status_code == 200:
             result = response.json()
@@ -23,45 +47,49 @@ def make_interactive_call(phone_number: str, test_mode: bool = False):
             print(f"❌ Error from API: {response.text}")
             return None
             
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         # Fallback: Direct Twilio call if API server is not running
         print("⚠️  API server not available, making direct call...")
-        return make_direct_call(phone_number, test_mode=test_mode)
+        return await asyncio.to_thread(make_direct_call, phone_number, test_mode=test_mode)
     except Exception as e:
         print(f"❌ Error making call through API: {e}")
         return None
 
+async def make_interactive_calls(phone_numbers: List[str], test_mode: bool = False,
+                                 client: Optional[httpx.AsyncClient] = None) -> List[Optional[str]]:
+    """Dial several numbers in sequence over one keep-alive connection"""
+    client = client or _CLIENT
+    return [await make_interactive_call(number, test_mode=test_mode, client=client)
+            for number in phone_numbers]
+
 def make_direct_call(phone_number: str, test_mode: bool = False):
     """Make a direct Twilio call (fallback)"""
     
     account_sid = os.environ["TWILIO_ACCOUNT_SID"]
     auth_token = os.environ["TWILIO_AUTH_TOKEN"]
     twilio_number = os.environ["TWILIO_NUMBER"]
-    base_url = os.environ.get("BASE_URL", "http://localhost:8000")
     
     client = Client(account_sid, auth_token)
     
     try:
         if test_mode:
-            twiml_url = "http://demo.twilio.com/docs/voice.xml"
+            # Demo TwiML only, no status callbacks to our server
+            call = client.calls.create(
+                from_=twilio_number,
+                to=phone_number,
+                url=_TEST_TWIML_URL,
+                method="POST"
+            )
         else:
-            # Add ngrok-skip-browser-warning parameter for free ngrok accounts
-            if 'ngrok' in base_url:
-                twiml_url = f"{base_url}/voice/greeting?ngrok-skip-browser-warning=true"
-                status_callback_url = f"{base_url}/voice/status?ngrok-skip-browser-warning=true"
-            else:
-                twiml_url = f"{base_url}/voice/greeting"
-                status_callback_url = f"{base_url}/voice/status"
-        
-        call = client.calls.create(
-            from_=twilio_number,
-            to=phone_number,
-            url=twiml_url,
-            method="POST",
-            status_callback=status_callback_url,
-            status_callback_event=['initiated', 'ringing', 'answered', 'completed'],
-            status_callback_method="POST"
-        )
+            call = client.calls.create(
+                from_=twilio_number,
+                to=phone_number,
+                url=_TWIML_URL,
+                method="POST",
+                status_callback=_STATUS_URL,
+                status_callback_event=['initiated', 'ringing', 'answered', 'completed'],
+                status_callback_method="POST"
+            )
         
         print(f"✅ Direct call initiated successfully!")
         print(f"📞 Call SID: {call.sid}")
@@ -78,8 +106,14 @@ if __name__ == "__main__":
     if not calling_number:
         calling_number = input("Enter phone number to call (include country code, e.g., +1234567890): ")
     
+    async def run():
+        try:
+            return await make_interactive_call(calling_number)
+        finally:
+            await close_client()
+    
     print(f"📞 Making interactive call to {calling_number}...")
-    call_sid = make_interactive_call(calling_number)
+    call_sid = asyncio.run(run())
     
     if call_sid:
         print("🎉 Call is connecting! You should receive a call shortly.")
@@ -1,52 +1,326 @@
 import openai
 import os
-import json
+import re
+import sys
+import hashlib
+import sqlite3
 import httpx
+import orjson
 import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
 from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 
 load_dotenv('.env.local')
 
+# Small, fast model for the short conversational replies on the greeting/general paths
+INTENT_MODEL = "gpt-4o-mini"
+
+# Cap on in-flight OpenAI requests across all calls so a burst does not trip rate limits
+_OPENAI_SEM = asyncio.Semaphore(int(os.getenv("OPENAI_CONCURRENCY", "8")))
+# Transient OpenAI failures retried with jittered exponential backoff
+_OPENAI_RETRY = retry(
+    wait=wait_exponential_jitter(initial=0.2, max=4),
+    stop=stop_after_attempt(3),
+    retry=retry_if_exception_type((
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError
+    )),
+    reraise=True
+)
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> openai.AsyncOpenAI:
+    """Process-wide OpenAI client, created on first use so every call shares its connection pool"""
+    # Retries are handled by _OPENAI_RETRY, so the SDK's own are turned off
+    return openai.AsyncOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        timeout=httpx.Timeout(15.0, connect=1.0),
+        max_retries=0
+    )
+
+# System prompts for the LLM turns; built once so the hot path only references them
+GREETING_SYSTEM_PROMPT = """You are a helpful voice assistant for managing emails and tasks.
+The user just called in. Analyze their request and determine what they want to do.
+
+Available actions:
+- read_emails: User wants to read their emails
+- calendar: User wants calendar information
+- tasks: User wants to manage tasks
+- general: General conversation or unclear intent
+
+Respond with a friendly acknowledgment and ask for clarification if needed.
+Always be conversational and natural, as this is a voice call.
+
+If they want to read emails, acknowledge and offer to start reading.
+If unclear, ask what they'd like help with today."""
+
+GENERAL_SYSTEM_PROMPT = """You are a helpful voice assistant. Be conversational and friendly.
+Keep responses brief since this is a voice call. Offer to help with emails, calendar, or tasks."""
+
+# Rolling memory: once the history passes _SUMMARY_EVERY entries, everything but the
+# last _HISTORY_WINDOW is folded into a running summary and the response chain restarts.
+# Only the caller's own words are carried over: assistant turns read out email subjects
+# and bodies, and Gmail content is not sent to OpenAI.
+_HISTORY_WINDOW = 8
+_SUMMARY_EVERY = 16
+_SUMMARY_PROMPT = """Summarize what the user said during this phone call with their email voice
+assistant in two or three sentences. Keep names and anything the user asked for."""
+
+# Spoken after each email's subject presentation
+_READING_INSTRUCTIONS = " Say 'read it' to hear the full email, 'next' to skip to the next one, 'respond' to reply, or 'stop' to finish."
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+# Intent vocabularies, one alternation per mode; each named group is an intent label.
+# Keywords match at the start of a word with any suffix, so "finished", "skipping",
+# "replying" and "todos" route like the bare keyword
+_GREETING_INTENT_RE = re.compile(r"\b(?P<email>email)\w*", re.IGNORECASE)
+_READING_INTENT_RE = re.compile(
+    r"\b(?:(?P<read>read|yes|sure|okay)"
+    r"|(?P<next>next|skip|continue)"
+    r"|(?P<respond>respond|reply|answer)"
+    r"|(?P<stop>stop|done|enough|finish))\w*",
+    re.IGNORECASE
+)
+_GENERAL_INTENT_RE = re.compile(
+    r"\b(?:(?P<email>email)"
+    r"|(?P<calendar>calendar|schedule|appointment)"
+    r"|(?P<task>task|todo)"
+    r"|(?P<goodbye>goodbye|bye|done|thank you|thanks))\w*",
+    re.IGNORECASE
+)
+
+# Actions returned with each turn's reply; VoiceHandler picks the TwiML by them
+ACT_CONTINUE = sys.intern("continue")
+ACT_END_CALL = sys.intern("end_call")
+ACT_START_EMAIL_READING = sys.intern("start_email_reading")
+ACT_READ_NEXT_EMAIL = sys.intern("read_next_email")
+ACT_CONTINUE_READING = sys.intern("continue_reading")
+ACT_WAIT_FOR_RESPONSE_CONTENT = sys.intern("wait_for_response_content")
+
+# Per mode: intent pattern, (intent, handler) pairs in priority order, and the
+# fallback handler; handlers are ConversationAI method names
+_MODE_ROUTES = {
+    "greeting": (
+        _GREETING_INTENT_RE,
+        (("email", "_start_email_reading"),),
+        "_greeting_reply"
+    ),
+    "email_reading": (
+        _READING_INTENT_RE,
+        (("read", "_read_full_email"), ("next", "_next_email"), ("respond", "_start_reply"), ("stop", "_stop_reading")),
+        "_reading_help"
+    ),
+    "responding": (None, (), "_send_reply"),
+    "general": (
+        _GENERAL_INTENT_RE,
+        (("email", "_start_email_reading"), ("calendar", "_calendar_events"), ("task", "_task_prompt"), ("goodbye", "_end_call")),
+        "_general_reply"
+    ),
+}
+
+_GREETING_FALLBACK = MappingProxyType({
+    "response_text": "Hello! I'm your email assistant. How can I help you today? You can ask me to read your emails, check your calendar, or manage tasks.",
+    "action": ACT_CONTINUE,
+    "tts_text": "Hello! I'm your email assistant. How can I help you today?"
+})
+_GOODBYE_TEXT = "You're welcome! Have a great day. Goodbye!"
+_END_CALL_RESPONSE = MappingProxyType({
+    "response_text": _GOODBYE_TEXT,
+    "action": ACT_END_CALL,
+    "tts_text": _GOODBYE_TEXT
+})
+
+def _reply(response_text: str, action: str = ACT_CONTINUE) -> Dict[str, Any]:
+    """Result dictionary for a turn whose spoken text is the response text"""
+    return {
+        "response_text": response_text,
+        "action": action,
+        "tts_text": response_text
+    }
+
+def _user_turns(turns: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """The caller's utterances from a slice of conversation history"""
+    return [turn for turn in turns if turn["role"] == "user"]
+
+def _tokenize(text: str) -> frozenset:
+    """Lowercase word set of an utterance"""
+    return frozenset(_WORD_RE.findall(text.lower()))
+
+@lru_cache(maxsize=32)
+def _prompt_hash(instructions: str) -> str:
+    """Short stable digest of a system prompt, used to namespace cached replies"""
+    return hashlib.sha256(instructions.encode()).hexdigest()[:16]
+
+def _match_intents(pattern: re.Pattern, text: str) -> frozenset:
+    """Labels of every intent mentioned in the utterance, found in a single scan"""
+    return frozenset(match.lastgroup for match in pattern.finditer(text))
+
+class ResponseCache:
+    """Approximate-match LRU cache for LLM replies to stateless utterances ("hi", "what can you do")
+    
+    Entries live in memory per namespace (mode plus a hash of the system prompt, so
+    editing a prompt invalidates its replies). When a path is given, exact utterances
+    are also persisted to sqlite so replies survive restarts and are shared across workers.
+    """
+    
+    def __init__(self, threshold: float = 0.9, max_entries: int = 1000, path: Optional[str] = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: Dict[str, OrderedDict] = {}  # namespace -> {token set: response}, oldest first
+        self._db = None
+        # The sqlite connection is used from worker threads, one at a time
+        self._db_lock = threading.Lock()
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(namespace TEXT, utterance TEXT, response TEXT, PRIMARY KEY (namespace, utterance))"
+            )
+            self._db.commit()
+    
+    @staticmethod
+    def _tokens(text: str) -> frozenset:
+        return _tokenize(text)
+    
+    @staticmethod
+    def _normalize(tokens: frozenset) -> str:
+        return " ".join(sorted(tokens))
+    
+    async def get(self, namespace: str, text: str) -> Optional[str]:
+        """Return a cached response whose utterance is similar enough to text"""
+        tokens = self._tokens(text)
+        if not tokens:
+            return None
+        entries = self._entries.setdefault(namespace, OrderedDict())
+        if tokens in entries:
+            entries.move_to_end(tokens)
+            return entries[tokens]
+        # Jaccard similarity over word sets
+        for cached_tokens, response in entries.items():
+            if len(tokens & cached_tokens) / len(tokens | cached_tokens) >= self.threshold:
+                entries.move_to_end(cached_tokens)
+                return response
+        if self._db is not None:
+            # sqlite blocks, so keep it off the event loop
+            response = await asyncio.to_thread(self._db_get, namespace, self._normalize(tokens))
+            if response is not None:
+                self._remember(entries, tokens, response)
+                return response
+        return None
+    
+    async def put(self, namespace: str, text: str, response: str) -> None:
+        """Store a response for text"""
+        tokens = self._tokens(text)
+        if not tokens:
+            return
+        self._remember(self._entries.setdefault(namespace, OrderedDict()), tokens, response)
+        if self._db is not None:
+            await asyncio.to_thread(self._db_put, namespace, self._normalize(tokens), response)
+    
+    def _db_get(self, namespace: str, utterance: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT response FROM responses WHERE namespace = ? AND utterance = ?",
+                (namespace, utterance)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def _db_put(self, namespace: str, utterance: str, response: str) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (namespace, utterance, response)
+            )
+            self._db.commit()
+    
+    def _remember(self, entries: OrderedDict, tokens: frozenset, response: str) -> None:
+        entries[tokens] = response
+        entries.move_to_end(tokens)
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+# Shared across calls so repeated phrases skip the OpenAI round-trip
+response_cache = ResponseCache(path=os.getenv("RESPONSE_CACHE_PATH"))
+
+# One keep-alive pool shared by every call's MCPClient. The MCP server is local,
+# so connects fail fast; reads stay long because tools wait on Gmail and the LLM.
+_MCP_HTTP = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+    timeout=httpx.Timeout(30.0, connect=1.0)
+)
+
+async def close_mcp_client():
+    """Close the shared MCP HTTP client"""
+    await _MCP_HTTP.aclose()
+
 class MCPClient:
     """MCP Client for communicating with the MCP server"""
     
-    def __init__(self, server_url: str = "http://localhost:3000"):
+    def __init__(self, server_url: str = "http://localhost:3000", client: Optional[httpx.AsyncClient] = None):
         self.server_url = server_url
-        self.client = httpx.AsyncClient()
+        self.client = client or _MCP_HTTP
+    
+    # Only failures where the request never reached the server are retried, since
+    # tools like next_email are not idempotent
+    @retry(
+        wait=wait_exponential_jitter(initial=0.2, max=4),
+        stop=stop_after_attempt(3),
+        retry=retry_if_exception_type((httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)),
+        reraise=True
+    )
+    async def _post(self, path: str, payload: Any) -> Any:
+        """POST a JSON payload to the MCP server and return the decoded response"""
+        response = await self.client.post(
+            f"{self.server_url}{path}",
+            content=orjson.dumps(payload),
+            headers={"content-type": "application/json"}
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
     
     async def call_tool(self, tool_name: str, **kwargs) -> str:
         """Call an MCP tool via HTTP"""
         try:
-            response = await self.client.post(
-                f"{self.server_url}/call-tool",
-                json={
-                    "tool": tool_name,
-                    "arguments": kwargs
-                },
-                timeout=30.0
-            )
-            response.raise_for_status()
-            return response.json().get("result", "No result")
+            result = await self._post("/call-tool", {
+                "tool": tool_name,
+                "arguments": kwargs
+            })
+            return result.get("result", "No result")
         except Exception as e:
             return f"Error calling MCP tool {tool_name}: {str(e)}"
     
     async def close(self):
-        """Close the HTTP client"""
-        await self.client.aclose()
+        """Close the HTTP client unless it is the shared pool"""
+        if self.client is not _MCP_HTTP:
+            await self.client.aclose()
 
 class ConversationAI:
     """AI conversation handler for voice calls - MCP Client Integration"""
     
     def __init__(self, user_id: str):
         self.user_id = user_id
-        self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.openai_client = get_openai_client()
         self.mcp_client = MCPClient()
         self.conversation_state = {
             "mode": "greeting",  # greeting, email_reading, responding, general
             "context": {},
-            "conversation_history": []
+            "conversation_history": [],
+            "summary": "",  # Older turns, condensed once they fall out of the history window
+            "previous_response_id": None  # OpenAI keeps earlier turns server-side
         }
+        self._summary_task: Optional[asyncio.Task] = None
+        # Speculative fetch of the next email's presentation text
+        self._next_email_task: Optional[asyncio.Task] = None
+        self._prefetched_email_text: Optional[str] = None
     
     async def __aenter__(self):
         """Async context manager entry"""
@@ -54,8 +328,57 @@ class ConversationAI:
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
+        self._discard_next_email_prefetch()
+        if self._summary_task is not None:
+            self._summary_task.cancel()
         await self.mcp_client.close()
     
+    @_OPENAI_RETRY
+    async def _create_response(self, **request):
+        """responses.create with retries and the global concurrency cap"""
+        async with _OPENAI_SEM:
+            return await self.openai_client.responses.create(**request)
+    
+    async def _complete(self, instructions: str, user_speech: str, max_tokens: int, temperature: float = 0.7) -> str:
+        """
+        Run one LLM turn chained onto the previous turn of this call
+        
+        Only the new utterance is sent; earlier turns are referenced by
+        previous_response_id instead of being retransmitted. After the history
+        has been summarized the chain restarts, so the summary and recent turns
+        are carried in the instructions instead.
+        """
+        if self.conversation_state["previous_response_id"] is None:
+            instructions += self._memory_context()
+        request = dict(
+            model=INTENT_MODEL,
+            instructions=instructions,
+            input=user_speech,
+            previous_response_id=self.conversation_state["previous_response_id"],
+            max_output_tokens=max_tokens,
+            temperature=temperature
+        )
+        response = await self._create_response(**request)
+        self.conversation_state["previous_response_id"] = response.id
+        return response.output_text
+    
+    async def _cached_complete(self, mode: str, instructions: str, user_speech: str, max_tokens: int) -> str:
+        """Serve a near-duplicate utterance from the response cache, else run an LLM turn
+        
+        Only context-free turns use the cache: once the call has a response chain,
+        a summary or earlier turns, the reply depends on this caller's conversation
+        and must neither be shared nor skip the chain.
+        """
+        if self.conversation_state["previous_response_id"] is not None or self._memory_context():
+            return await self._complete(instructions, user_speech, max_tokens)
+        namespace = f"{mode}:{_prompt_hash(instructions)}"
+        reply = await response_cache.get(namespace, user_speech)
+        if reply is None:
+            # Deterministic sampling so the cached reply is the one the model would give anyway
+            reply = await self._complete(instructions, user_speech, max_tokens, temperature=0)
+            await response_cache.put(namespace, user_speech, reply)
+        return reply
+    
     async def process_user_input(self, user_speech: str) -> Dict[str, Any]:
         """
         Process user's speech input and return appropriate response
@@ -74,217 +397,218 @@ class ConversationAI:
             })
             
             # Determine intent and generate response
-            if self.conversation_state["mode"] == "greeting":
-                return await self._handle_greeting_mode(user_speech)
-            elif self.conversation_state["mode"] == "email_reading":
-                return await self._handle_email_reading_mode(user_speech)
-            elif self.conversation_state["mode"] == "responding":
-                return await self._handle_responding_mode(user_speech)
-            else:
-                return await self._handle_general_mode(user_speech)
+            result = await self._dispatch(user_speech)
+            
+            self.conversation_state["conversation_history"].append({
+                "role": "assistant",
+                "content": result["response_text"]
+            })
+            self._maybe_summarize_history()
+            return result
                 
         except Exception as e:
             return {
                 "response_text": f"I'm sorry, I encountered an error: {str(e)}. Could you please try again?",
-                "action": "continue",
+                "action": ACT_CONTINUE,
                 "tts_text": "I'm sorry, I encountered an error. Could you please try again?"
             }
     
-    async def _handle_greeting_mode(self, user_speech: str) -> Dict[str, Any]:
-        """Handle the initial greeting and user request"""
-        
-        # Use OpenAI to understand the user's intent
-        system_prompt = """You are a helpful voice assistant for managing emails and tasks. 
-        The user just called in. Analyze their request and determine what they want to do.
-        
-        Available actions:
-        - read_emails: User wants to read their emails
-        - calendar: User wants calendar information
-        - tasks: User wants to manage tasks
-        - general: General conversation or unclear intent
-        
-        Respond with a friendly acknowledgment and ask for clarification if needed.
-        Always be conversational and natural, as this is a voice call.
-        
-        If they want to read emails, acknowledge and offer to start reading.
-        If unclear, ask what they'd like help with today.
-        """
-        
+    def _memory_context(self) -> str:
+        """Summary plus the recent turns (excluding the current utterance) for a fresh response chain"""
+        summary = self.conversation_state["summary"]
+        recent = _user_turns(self.conversation_state["conversation_history"][-_HISTORY_WINDOW:-1])
+        if not summary and not recent:
+            return ""
+        context = "\n\nConversation so far:"
+        if summary:
+            context += f"\n{summary}"
+        for turn in recent:
+            context += f"\nuser: {turn['content'][:300]}"
+        return context
+    
+    def _maybe_summarize_history(self) -> None:
+        """Start folding old turns into the summary once the history outgrows its budget"""
+        history = self.conversation_state["conversation_history"]
+        if len(history) <= _SUMMARY_EVERY or self._summary_task is not None:
+            return
+        self._summary_task = asyncio.create_task(self._summarize_history(history[:-_HISTORY_WINDOW]))
+    
+    async def _summarize_history(self, older: List[Dict[str, str]]) -> None:
+        """Condense older turns with the small model, then drop them and restart the response chain"""
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_speech}
-                ],
-                max_tokens=150,
-                temperature=0.7
+            transcript = "\n".join(f"user: {turn['content'][:300]}" for turn in _user_turns(older))
+            if self.conversation_state["summary"]:
+                transcript = f"Earlier summary: {self.conversation_state['summary']}\n{transcript}"
+            response = await self._create_response(
+                model=INTENT_MODEL,
+                instructions=_SUMMARY_PROMPT,
+                input=transcript,
+                max_output_tokens=120,
+                temperature=0,
+                store=False  # Nothing chains onto the summary, so it is not kept server-side
             )
-            
-            ai_response = response.choices[0].message.content
-            
-            # Determine action based on user input
-            user_lower = user_speech.lower()
-            if any(keyword in user_lower for keyword in ["email", "emails", "read email", "check email"]):
-                self.conversation_state["mode"] = "email_reading"
-                # Initialize credentials and get emails via MCP
-                cred_result = await self.mcp_client.call_tool("initialize_creds", user_id=self.user_id)
-                email_result = await self.mcp_client.call_tool("get_emails", user_id=self.user_id, max_emails=5)
-                
-                response_text = f"Sure! Let me check your emails. {email_result}. I'll present each email's subject first, then you can choose whether to read the full email or skip to the next one."
-                action = "start_email_reading"
-            else:
-                response_text = ai_response
-                action = "continue"
-            
-            return {
-                "response_text": response_text,
-                "action": action,
-                "tts_text": response_text
-            }
-            
+            self.conversation_state["summary"] = response.output_text
+            del self.conversation_state["conversation_history"][:len(older)]
+            self.conversation_state["previous_response_id"] = None
         except Exception as e:
-            return {
-                "response_text": "Hello! I'm your email assistant. How can I help you today? You can ask me to read your emails, check your calendar, or manage tasks.",
-                "action": "continue",
-                "tts_text": "Hello! I'm your email assistant. How can I help you today?"
-            }
+            logging.warning(f"⚠️ Could not summarize conversation history: {e}")
+        finally:
+            self._summary_task = None
     
-    async def _handle_email_reading_mode(self, user_speech: str) -> Dict[str, Any]:
-        """Handle user input during email reading"""
-        
-        user_lower = user_speech.lower()
-        
-        if any(keyword in user_lower for keyword in ["read", "read it", "read full", "read full email", "yes", "sure", "okay"]):
-            # Read the full email content
-            full_email = await self.mcp_client.call_tool("read_full_current_email", user_id=self.user_id)
-            response_text = full_email
-            action = "continue"
-        
-        elif any(keyword in user_lower for keyword in ["next", "skip", "continue"]):
-            # Move to next email
-            next_result = await self.mcp_client.call_tool("next_email", user_id=self.user_id)
-            
-            if "No more emails" in next_result:
-                self.conversation_state["mode"] = "general"
-                response_text = "That's all your emails! Is there anything else I can help you with?"
-                action = "continue"
-            else:
-                response_text = f"{next_result}. Here's the next email."
-                action = "read_next_email"
-        
-        elif any(keyword in user_lower for keyword in ["respond", "reply", "answer"]):
-            # Switch to responding mode
-            self.conversation_state["mode"] = "responding"
-            response_text = "What would you like me to say in your reply?"
-            action = "wait_for_response_content"
+    async def _dispatch(self, user_speech: str) -> Dict[str, Any]:
+        """Route the utterance through the current mode's intent table"""
+        pattern, routes, fallback = _MODE_ROUTES.get(self.conversation_state["mode"], _MODE_ROUTES["general"])
+        intents = _match_intents(pattern, user_speech) if pattern else frozenset()
+        for intent, handler in routes:
+            if intent in intents:
+                return await getattr(self, handler)(user_speech)
+        return await getattr(self, fallback)(user_speech)
+    
+    # Greeting mode
+    
+    async def _start_email_reading(self, user_speech: str) -> Dict[str, Any]:
+        """Load the inbox and start presenting emails"""
+        try:
+            self.conversation_state["mode"] = "email_reading"
+            self._discard_next_email_prefetch()
+            # No LLM turn needed; initialize credentials and get emails in one MCP round-trip
+            email_result = await self.mcp_client.call_tool("start_email_session", user_id=self.user_id, max_emails=5)
+            return _reply(
+                f"Sure! Let me check your emails. {email_result}. I'll present each email's subject first, then you can choose whether to read the full email or skip to the next one.",
+                action=ACT_START_EMAIL_READING
+            )
+        except Exception:
+            return dict(_GREETING_FALLBACK)
+    
+    async def _greeting_reply(self, user_speech: str) -> Dict[str, Any]:
+        """Let the LLM answer an opening request that matched no keyword"""
+        try:
+            return _reply(await self._cached_complete("greeting", GREETING_SYSTEM_PROMPT, user_speech, max_tokens=100))
+        except Exception:
+            return dict(_GREETING_FALLBACK)
+    
+    # Email reading mode
+    
+    async def _read_full_email(self, user_speech: str) -> Dict[str, Any]:
+        """Read the full email content"""
+        return _reply(await self.mcp_client.call_tool("read_full_current_email", user_id=self.user_id))
+    
+    async def _next_email(self, user_speech: str) -> Dict[str, Any]:
+        """Move to the next email"""
+        # Settle the prefetch first so it cannot race with the index moving
+        prefetched = await self._await_next_email_prefetch()
+        next_result = await self.mcp_client.call_tool("next_email", user_id=self.user_id)
         
-        elif any(keyword in user_lower for keyword in ["stop", "done", "finish"]):
-            # Stop reading emails
+        if "No more emails" in next_result:
             self.conversation_state["mode"] = "general"
-            response_text = "Finished reading emails. How else can I help you?"
-            action = "continue"
+            return _reply("That's all your emails! Is there anything else I can help you with?")
         
-        else:
-            # Continue reading current email or ask for clarification
-            response_text = "I can read this email, skip to the next one, help you respond to this one, or stop reading. What would you like to do?"
-            action = "continue"
-        
-        return {
-            "response_text": response_text,
-            "action": action,
-            "tts_text": response_text
-        }
+        self._prefetched_email_text = prefetched
+        return _reply(f"{next_result}. Here's the next email.", action=ACT_READ_NEXT_EMAIL)
     
-    async def _handle_responding_mode(self, user_speech: str) -> Dict[str, Any]:
-        """Handle composing email responses"""
-        
+    async def _start_reply(self, user_speech: str) -> Dict[str, Any]:
+        """Switch to responding mode"""
+        self.conversation_state["mode"] = "responding"
+        return _reply("What would you like me to say in your reply?", action=ACT_WAIT_FOR_RESPONSE_CONTENT)
+    
+    async def _stop_reading(self, user_speech: str) -> Dict[str, Any]:
+        """Stop reading emails; the speculative next email will not be needed"""
+        self.conversation_state["mode"] = "general"
+        self._discard_next_email_prefetch()
+        return _reply("Finished reading emails. How else can I help you?")
+    
+    async def _reading_help(self, user_speech: str) -> Dict[str, Any]:
+        """Ask for clarification about the current email"""
+        return _reply("I can read this email, skip to the next one, help you respond to this one, or stop reading. What would you like to do?")
+    
+    # Responding mode
+    
+    async def _send_reply(self, user_speech: str) -> Dict[str, Any]:
+        """Send the dictated reply and go back to email reading"""
         # Store the response content
         self.conversation_state["context"]["response_content"] = user_speech
         
-        # Get current email info for reply
-        current_email = await self.mcp_client.call_tool("get_current_email_for_reading", user_id=self.user_id)
-        
-        # For now, simulate sending
-        reply_result = await self.mcp_client.call_tool(
-            "send_email_reply",
-            user_id=self.user_id,
-            recipient="sender@example.com",  # This would be extracted from current email
-            subject="Re: Email Subject",      # This would be from current email
-            body=user_speech
+        # Get current email info for reply alongside the (for now simulated) send
+        current_email, reply_result = await asyncio.gather(
+            self.mcp_client.call_tool("get_current_email_for_reading", user_id=self.user_id),
+            self.mcp_client.call_tool(
+                "send_email_reply",
+                user_id=self.user_id,
+                recipient="sender@example.com",  # This would be extracted from current email
+                subject="Re: Email Subject",      # This would be from current email
+                body=user_speech
+            )
         )
         
         # Switch back to email reading mode
         self.conversation_state["mode"] = "email_reading"
-        
-        response_text = f"{reply_result}. Would you like me to continue reading emails or do something else?"
-        
-        return {
-            "response_text": response_text,
-            "action": "continue",
-            "tts_text": response_text
-        }
+        return _reply(f"{reply_result}. Would you like me to continue reading emails or do something else?")
     
-    async def _handle_general_mode(self, user_speech: str) -> Dict[str, Any]:
-        """Handle general conversation and commands"""
-        
-        user_lower = user_speech.lower()
-        
-        if any(keyword in user_lower for keyword in ["email", "emails", "read email", "check email"]):
-            self.conversation_state["mode"] = "greeting"
-            return await self._handle_greeting_mode(user_speech)
-        
-        elif any(keyword in user_lower for keyword in ["calendar", "schedule", "appointments"]):
-            calendar_result = await self.mcp_client.call_tool("get_calendar_events", user_id=self.user_id)
-            response_text = calendar_result
-        
-        elif any(keyword in user_lower for keyword in ["task", "tasks", "todo"]):
-            response_text = "I can help you create tasks. What task would you like me to add?"
-        
-        elif any(keyword in user_lower for keyword in ["goodbye", "bye", "done", "thank you", "thanks"]):
-            response_text = "You're welcome! Have a great day. Goodbye!"
-            return {
-                "response_text": response_text,
-                "action": "end_call",
-                "tts_text": response_text
-            }
-        
-        else:
-            # Use OpenAI for general conversation
-            system_prompt = """You are a helpful voice assistant. Be conversational and friendly.
-            Keep responses brief since this is a voice call. Offer to help with emails, calendar, or tasks."""
-            
-            try:
-                response = self.openai_client.chat.completions.create(
-                    model="gpt-4",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_speech}
-                    ],
-                    max_tokens=100,
-                    temperature=0.7
-                )
-                
-                response_text = response.choices[0].message.content
-            except:
-                response_text = "I can help you with reading emails, checking your calendar, or managing tasks. What would you like to do?"
-        
-        return {
-            "response_text": response_text,
-            "action": "continue",
-            "tts_text": response_text
-        }
+    # General mode
+    
+    async def _calendar_events(self, user_speech: str) -> Dict[str, Any]:
+        """Read out upcoming calendar events"""
+        return _reply(await self.mcp_client.call_tool("get_calendar_events", user_id=self.user_id))
+    
+    async def _task_prompt(self, user_speech: str) -> Dict[str, Any]:
+        """Ask which task to create"""
+        return _reply("I can help you create tasks. What task would you like me to add?")
+    
+    async def _end_call(self, user_speech: str) -> Dict[str, Any]:
+        """Say goodbye and hang up"""
+        return dict(_END_CALL_RESPONSE)
+    
+    async def _general_reply(self, user_speech: str) -> Dict[str, Any]:
+        """Use OpenAI for general conversation"""
+        try:
+            # General mode always follows earlier turns, so its replies are never context-free enough to cache
+            response_text = await self._complete(GENERAL_SYSTEM_PROMPT, user_speech, max_tokens=60)
+        except Exception:
+            response_text = "I can help you with reading emails, checking your calendar, or managing tasks. What would you like to do?"
+        return _reply(response_text)
+    
+    def prefetch_next_email(self) -> None:
+        """Start fetching the next email's presentation while the current one is read aloud"""
+        self._discard_next_email_prefetch()
+        self._next_email_task = asyncio.create_task(
+            self.mcp_client.call_tool("peek_next_email_for_reading", user_id=self.user_id)
+        )
+    
+    def _discard_next_email_prefetch(self) -> None:
+        """Drop any prefetched next email, e.g. when the email list is reloaded"""
+        if self._next_email_task is not None:
+            self._next_email_task.cancel()
+            self._next_email_task = None
+        self._prefetched_email_text = None
+    
+    async def _await_next_email_prefetch(self) -> Optional[str]:
+        """Wait for the pending prefetch and return its text, or None if unusable"""
+        task = self._next_email_task
+        self._next_email_task = None
+        if task is None:
+            return None
+        try:
+            reading_text = await task
+        except Exception:
+            return None
+        # MCPClient reports failures as text; those fall back to a fresh fetch
+        if reading_text.startswith(("Error", "Sorry,")):
+            return None
+        return reading_text
     
     async def get_current_email_for_reading(self) -> Optional[str]:
         """Get the current email formatted for text-to-speech reading"""
         try:
-            # Use the MCP client to get voice-optimized email reading
-            reading_text = await self.mcp_client.call_tool("get_current_email_for_reading", user_id=self.user_id)
+            reading_text = self._prefetched_email_text
+            self._prefetched_email_text = None
+            if reading_text is None:
+                # Use the MCP client to get voice-optimized email reading
+                reading_text = await self.mcp_client.call_tool("get_current_email_for_reading", user_id=self.user_id)
             
             # Add instructions for user interaction (this now presents just the subject)
             if not reading_text.startswith("Sorry,"):
-                reading_text += " Say 'read it' to hear the full email, 'next' to skip to the next one, 'respond' to reply, or 'stop' to finish."
+                reading_text += _READING_INSTRUCTIONS
             
             return reading_text
         except Exception as e:
-            return f"Error reading email: {str(e)}" 
\ No newline at end of file
+            return f"Error reading email: {str(e)}"
\ No newline at end of file
@@ -1,28 +1,275 @@
 import os.path
 import base64
 import re
-import json
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Any
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Tuple
 
+import httplib2
+import orjson
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from google.cloud import aiplatform
 import vertexai
-from vertexai.generative_models import GenerativeModel
+from vertexai.generative_models import GenerationConfig, GenerativeModel
 
 from dotenv import load_dotenv
 load_dotenv('.env.local')
 
 project_id = os.getenv("GOOGLE_PROJECT_ID")
 
+# Gmail accepts up to 100 calls per batch request, but every inner call counts
+# against the per-user concurrency quota. Small batches run in parallel instead.
+GMAIL_BATCH_SIZE = 10
+GMAIL_MAX_CONCURRENT_BATCHES = 10
+GMAIL_MAX_RETRIES = 5
+
+# Static part of the Gemini analysis prompt. As a system instruction it is a shared
+# prefix across calls, which Gemini's implicit context caching can reuse.
+ANALYSIS_INSTRUCTIONS = """Analyze the email you are given and provide an importance score and reasoning.
+
+ANALYSIS CRITERIA:
+- Sender reputation and relationship (personal vs automated)
+- Subject urgency and keywords
+- Content urgency and action items
+- Professional vs personal context
+- Time sensitivity
+- Financial or legal implications
+
+RESPONSE FORMAT (JSON only):
+{
+    "importance_score": <number 0-100>,
+    "importance_level": "<HIGH|MEDIUM|LOW>",
+    "reasoning": [
+        "Primary reason for this score",
+        "Secondary reason",
+        "Additional context"
+    ],
+    "urgency_indicators": [
+        "List any urgent keywords or phrases found"
+    ],
+    "action_required": <true|false>,
+    "estimated_response_time": "<IMMEDIATE|WITHIN_HOUR|WITHIN_DAY|WHEN_CONVENIENT>"
+}
+
+Score Guidelines:
+- 80-100: Critical/Urgent (HIGH) - Immediate attention required
+- 50-79: Important (MEDIUM) - Should respond within hours
+- 20-49: Routine (LOW) - Can wait 1-2 days
+- 0-19: Low priority (LOW) - Can wait or ignore"""
+
+# Gemini structured output: replies are guaranteed JSON matching the response format
+ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "importance_score": {"type": "integer"},
+        "importance_level": {"type": "string", "enum": ["HIGH", "MEDIUM", "LOW"]},
+        "reasoning": {"type": "array", "items": {"type": "string"}},
+        "urgency_indicators": {"type": "array", "items": {"type": "string"}},
+        "action_required": {"type": "boolean"},
+        "estimated_response_time": {
+            "type": "string",
+            "enum": ["IMMEDIATE", "WITHIN_HOUR", "WITHIN_DAY", "WHEN_CONVENIENT"]
+        }
+    },
+    "required": ["importance_score", "importance_level", "reasoning"]
+}
+ANALYSIS_CONFIG = GenerationConfig(response_mime_type="application/json", response_schema=ANALYSIS_SCHEMA)
+ANALYSIS_BATCH_CONFIG = GenerationConfig(
+    response_mime_type="application/json",
+    response_schema={
+        "type": "array",
+        "items": {
+            **ANALYSIS_SCHEMA,
+            "properties": {"id": {"type": "string"}, **ANALYSIS_SCHEMA["properties"]},
+            "required": ["id", *ANALYSIS_SCHEMA["required"]]
+        }
+    }
+)
+
+# Per-email Gemini prompt: sender, subject, date, body, snippet, labels
+EMAIL_PROMPT_TEMPLATE = """EMAIL ANALYSIS REQUEST:
+
+From: %s
+Subject: %s
+Date: %s
+Body: %s
+Snippet: %s
+Gmail Labels: %s
+"""
+
+# Emails analyzed per batched Gemini call, and how many calls run at once
+AI_BATCH_SIZE = 10
+AI_MAX_CONCURRENT_CALLS = 10
+
+# Gemini analyses are cached per message ID across runs
+ANALYSIS_CACHE_PATH = os.getenv(
+    "ANALYSIS_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".gmail_assistant", "analysis_cache.sqlite")
+)
+
+# Partial responses: listings only need headers, labels and the snippet
+METADATA_HEADERS = ['Subject', 'From', 'Date']
+METADATA_FIELDS = 'id,threadId,labelIds,snippet,payload/headers'
+BODY_FIELDS = 'payload(mimeType,body/data,parts(mimeType,body/data))'
+
+# Worker threads shared by every GmailAssistant for concurrent batch requests
+_BATCH_POOL = ThreadPoolExecutor(max_workers=GMAIL_MAX_CONCURRENT_BATCHES, thread_name_prefix="gmail-batch")
+_AI_POOL = ThreadPoolExecutor(max_workers=AI_MAX_CONCURRENT_CALLS, thread_name_prefix="gemini")
+
+# Subject keywords that raise an email's importance in the rule-based analysis
+URGENT_KEYWORDS = ('urgent', 'asap', 'important', 'deadline', 'action required',
+                   'invoice', 'payment', 'security', 'verify', 'expire')
+_URGENT_RE = re.compile('|'.join(re.escape(keyword) for keyword in URGENT_KEYWORDS))
+_HTML_TAG_RE = re.compile(r'<[^<]+?>')
+_AUTOMATED_SENDER_RE = re.compile(r'no-?reply', re.IGNORECASE)
+_SENDER_RE = re.compile(r'<([^>]+)>')
+
+
+class AnalysisCache:
+    """Importance analyses keyed by Gmail message ID (messages never change once sent)."""
+    
+    def __init__(self, path: str, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS analyses "
+            "(msg_id TEXT PRIMARY KEY, analysis_json TEXT, created REAL)"
+        )
+        self._db.commit()
+    
+    def get(self, msg_id: str) -> Optional[Dict[str, Any]]:
+        """Return the cached analysis for msg_id, if any."""
+        with self._lock:
+            if msg_id in self._entries:
+                self._entries.move_to_end(msg_id)
+                return self._entries[msg_id]
+            row = self._db.execute(
+                "SELECT analysis_json FROM analyses WHERE msg_id = ?", (msg_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            analysis = orjson.loads(row[0])
+            self._remember(msg_id, analysis)
+            return analysis
+    
+    def put(self, msg_id: str, analysis: Dict[str, Any]) -> None:
+        """Store an analysis in memory and on disk."""
+        with self._lock:
+            self._remember(msg_id, analysis)
+            self._db.execute(
+                "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?)",
+                (msg_id, orjson.dumps(analysis).decode(), time.time())
+            )
+            self._db.commit()
+    
+    def _remember(self, msg_id: str, analysis: Dict[str, Any]) -> None:
+        self._entries[msg_id] = analysis
+        self._entries.move_to_end(msg_id)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+_analysis_cache: Optional[AnalysisCache] = None
+_analysis_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Process-wide analysis cache, opened on first use."""
+    global _analysis_cache
+    if _analysis_cache is None:
+        with _analysis_cache_lock:
+            if _analysis_cache is None:
+                _analysis_cache = AnalysisCache(ANALYSIS_CACHE_PATH)
+    return _analysis_cache
+
+
+def count_importance_levels(results: List[Dict[str, Any]]) -> Counter:
+    """Count analyzed emails per importance level in a single pass."""
+    return Counter(result['analysis']['importance_level'] for result in results)
+
+
+def _find_urgent_keywords(text: str) -> set:
+    """Urgent keywords occurring in text, found in a single pass."""
+    return set(_URGENT_RE.findall(text))
+
+
+@lru_cache(maxsize=4096)
+def _sender_address(sender: str) -> str:
+    """Address part of a From header ("Name <addr>" -> "addr"); senders repeat a lot."""
+    if '<' not in sender:
+        return sender
+    match = _SENDER_RE.search(sender)
+    return match.group(1) if match else sender
+
+
+def _first_json_object(text: str) -> Optional[str]:
+    """Return the first complete top-level {...} in text, or None while it is still open."""
+    start = text.find('{')
+    if start == -1:
+        return None
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:index + 1]
+    return None
+
+
+def _decode_body_data(data: str) -> bytes:
+    """Decode a Gmail base64url body part to raw bytes."""
+    return base64.urlsafe_b64decode(data.encode('ascii'))
+
+
+def _html_to_text(html_body: bytes) -> str:
+    """Strip HTML markup from a raw HTML body part."""
+    return _HTML_TAG_RE.sub('', html_body.decode('utf-8', errors='replace'))
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """Whether a Gmail API error is a 429 or a rateLimitExceeded quota error."""
+    if not isinstance(error, HttpError):
+        return False
+    return error.resp.status == 429 or 'rateLimitExceeded' in str(error)
+
 
 class GmailAssistant:
     """AI-powered Gmail assistant for email importance analysis."""
     
+    # API clients shared by every instance; per-instance state is only creds and caches.
+    # Sharing the Gmail service is safe because each thread executes on its own HTTP connection.
+    _gmail_services: Dict[Tuple[str, str], Any] = {}
+    _vertex_models: Dict[Tuple[str, str], GenerativeModel] = {}
+    _shared_lock = threading.Lock()
+    
     def __init__(self, credentials_path: str = None, project_id: str = None, location: str = "us-central1"):
         """
         Initialize the Gmail Assistant.
@@ -41,6 +288,13 @@ class GmailAssistant:
         self.creds = None
         self.gmail_service = None
         self.vertex_model = None
+        self._http_local = threading.local()
+        
+        # Parsed message details reused between inbox reads, kept in step via the history API
+        self._message_cache: Dict[str, Dict[str, Any]] = {}
+        # One instance serves concurrent inbox reads from worker threads
+        self._message_cache_lock = threading.Lock()
+        self._last_history_id: Optional[str] = None
         
         # Initialize services
         self._initialize_credentials()
@@ -67,8 +321,15 @@ class GmailAssistant:
     def _initialize_gmail_service(self) -> None:
         """Initialize Gmail API service."""
         try:
-            self.gmail_service = build("gmail", "v1", credentials=self.creds)
-            print("✅ Gmail service initialized successfully")
+            key = (self.creds.client_id, self.creds.refresh_token)
+            with GmailAssistant._shared_lock:
+                if key not in GmailAssistant._gmail_services:
+                    # The discovery document ships with the client library, so no network fetch or cache is needed
+                    GmailAssistant._gmail_services[key] = build(
+                        "gmail", "v1", credentials=self.creds, static_discovery=True, cache_discovery=False
+                    )
+                    print("✅ Gmail service initialized successfully")
+            self.gmail_service = GmailAssistant._gmail_services[key]
         except Exception as e:
             print(f"❌ Error initializing Gmail service: {e}")
             raise
@@ -76,59 +337,178 @@ class GmailAssistant:
     def _initialize_vertex_ai(self) -> None:
         """Initialize Vertex AI with OAuth credentials."""
         try:
-            # Initialize Vertex AI with the same credentials
-            vertexai.init(
-                project=self.project_id, 
-                location=self.location,
-                credentials=self.creds
-            )
-            self.vertex_model = GenerativeModel('gemini-1.5-flash')
-            print("✅ Vertex AI (Gemini) initialized successfully")
+            key = (self.project_id, self.location)
+            with GmailAssistant._shared_lock:
+                if key not in GmailAssistant._vertex_models:
+                    # Initialize Vertex AI with the same credentials
+                    vertexai.init(
+                        project=self.project_id, 
+                        location=self.location,
+                        credentials=self.creds
+                    )
+                    GmailAssistant._vertex_models[key] = GenerativeModel(
+                        'gemini-1.5-flash', system_instruction=ANALYSIS_INSTRUCTIONS
+                    )
+                    print("✅ Vertex AI (Gemini) initialized successfully")
+            self.vertex_model = GmailAssistant._vertex_models[key]
         except Exception as e:
             print(f"⚠️  Warning: Could not initialize Vertex AI: {e}")
             print("📋 Will use fallback analysis instead")
             self.vertex_model = None
     
-    def get_message_details(self, msg_id: str) -> Optional[Dict[str, Any]]:
+    def get_message_details(self, msg_id: str, format: str = 'full') -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a specific email message.
         
         Args:
             msg_id: Gmail message ID
+            format: 'full' for headers and body, 'metadata' for headers only (body is None)
             
         Returns:
             Dictionary containing email details or None if error
         """
         try:
-            message = self.gmail_service.users().messages().get(
-                userId="me", id=msg_id
-            ).execute()
+            message = self._get_message_request(msg_id, format).execute(http=self._thread_http())
+            return self._parse_message(message)
+        except Exception as error:
+            print(f"❌ Error getting message {msg_id}: {error}")
+            return None
+    
+    def get_message_body(self, msg_id: str) -> str:
+        """
+        Get the body text of a single email message.
+        
+        Args:
+            msg_id: Gmail message ID
             
-            # Extract headers
-            headers = message['payload'].get('headers', [])
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-            sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown Sender')
-            date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
+        Returns:
+            Plain-text body
             
-            # Extract body
-            body = self._extract_message_body(message['payload'])
+        Raises:
+            HttpError: If the message could not be retrieved; callers retry on a later read
+        """
+        message = self.gmail_service.users().messages().get(
+            userId="me", id=msg_id, fields=BODY_FIELDS
+        ).execute(http=self._thread_http())
+        return self._extract_message_body(message['payload'])
+    
+    def _get_message_request(self, msg_id: str, format: str = 'full'):
+        """Build a messages.get request; metadata requests only ask for the fields we parse."""
+        if format == 'metadata':
+            return self.gmail_service.users().messages().get(
+                userId="me", id=msg_id, format='metadata',
+                metadataHeaders=METADATA_HEADERS, fields=METADATA_FIELDS
+            )
+        return self.gmail_service.users().messages().get(userId="me", id=msg_id)
+    
+    def get_messages_details_batch(self, msg_ids: List[str], format: str = 'full') -> List[Dict[str, Any]]:
+        """
+        Get details for several messages using concurrent Gmail batch requests.
+        
+        Messages are split into small batches that run in parallel. Messages
+        rejected for rate limiting are retried with exponential backoff.
+        
+        Args:
+            msg_ids: Gmail message IDs
+            format: 'full' for headers and body, 'metadata' for headers only (body is None)
             
-            # Get labels
-            labels = message.get('labelIds', [])
+        Returns:
+            List of email detail dictionaries in msg_ids order (failed messages are skipped)
+        """
+        messages = {}
+        pending = list(msg_ids)
+        
+        for attempt in range(GMAIL_MAX_RETRIES + 1):
+            if not pending:
+                break
+            if attempt:
+                delay = min(64, 2 ** attempt + random.random())
+                print(f"⏳ {len(pending)} messages rate limited, retrying in {delay:.1f}s")
+                time.sleep(delay)
             
-            return {
-                'id': msg_id,
-                'threadId': message['threadId'],
-                'subject': subject,
-                'sender': sender,
-                'date': date,
-                'body': body,
-                'labels': labels,
-                'snippet': message.get('snippet', '')
-            }
+            chunks = [pending[start:start + GMAIL_BATCH_SIZE] for start in range(0, len(pending), GMAIL_BATCH_SIZE)]
+            pending = []
+            for fetched, rate_limited in _BATCH_POOL.map(self._execute_batch, chunks, [format] * len(chunks)):
+                messages.update(fetched)
+                pending.extend(rate_limited)
+        
+        if pending:
+            print(f"❌ Giving up on {len(pending)} rate-limited messages")
+        
+        results = []
+        for msg_id in msg_ids:
+            if msg_id not in messages:
+                continue
+            try:
+                results.append(self._parse_message(messages[msg_id]))
+            except Exception as error:
+                print(f"❌ Error getting message {msg_id}: {error}")
+        return results
+    
+    def _execute_batch(self, msg_ids: List[str], format: str = 'full') -> Tuple[Dict[str, Any], List[str]]:
+        """Run one batch request; returns fetched messages and the IDs to retry."""
+        messages = {}
+        rate_limited = []
+        
+        def _collect(request_id, response, exception):
+            if exception is None:
+                messages[request_id] = response
+            elif _is_rate_limited(exception):
+                rate_limited.append(request_id)
+            else:
+                print(f"❌ Error getting message {request_id}: {exception}")
+        
+        batch = self.gmail_service.new_batch_http_request(callback=_collect)
+        for msg_id in msg_ids:
+            batch.add(self._get_message_request(msg_id, format), request_id=msg_id)
+        try:
+            batch.execute(http=self._thread_http())
         except Exception as error:
-            print(f"❌ Error getting message {msg_id}: {error}")
+            if _is_rate_limited(error):
+                return messages, [msg_id for msg_id in msg_ids if msg_id not in messages]
+            print(f"❌ Error executing batch request: {error}")
+        return messages, rate_limited
+    
+    def _thread_http(self):
+        """
+        Authorized HTTP connection for the current thread (httplib2 is not thread-safe).
+        
+        Every Gmail call executes on it, so each thread keeps its connection open and
+        body fetches from asyncio.to_thread never share a socket with batch workers.
+        """
+        if self.creds is None:
             return None
+        http = getattr(self._http_local, 'http', None)
+        if http is None:
+            http = AuthorizedHttp(self.creds, http=httplib2.Http())
+            self._http_local.http = http
+        return http
+    
+    def _parse_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a Gmail API message resource into an email details dictionary."""
+        # Extract headers
+        headers = {h['name']: h['value'] for h in message['payload'].get('headers', [])}
+        subject = headers.get('Subject', 'No Subject')
+        sender = headers.get('From', 'Unknown Sender')
+        date = headers.get('Date', '')
+        
+        # Extract body (metadata-only messages have none; it is fetched on demand)
+        payload = message['payload']
+        body = self._extract_message_body(payload) if 'mimeType' in payload else None
+        
+        # Get labels
+        labels = message.get('labelIds', [])
+        
+        return {
+            'id': message['id'],
+            'threadId': message['threadId'],
+            'subject': subject,
+            'sender': sender,
+            'date': date,
+            'body': body,
+            'labels': labels,
+            'snippet': message.get('snippet', '')
+        }
     
     def _extract_message_body(self, payload: Dict) -> str:
         """Extract the body text from email payload."""
@@ -138,17 +518,16 @@ class GmailAssistant:
             for part in payload['parts']:
                 if part['mimeType'] == 'text/plain':
                     data = part['body']['data']
-                    body = base64.urlsafe_b64decode(data).decode('utf-8')
+                    body = _decode_body_data(data).decode('utf-8', errors='replace')
                     break
                 elif part['mimeType'] == 'text/html':
                     data = part['body']['data']
-                    html_body = base64.urlsafe_b64decode(data).decode('utf-8')
                     # Strip HTML tags for basic text
-                    body = re.sub('<[^<]+?>', '', html_body)
+                    body = _html_to_text(_decode_body_data(data))
         else:
             if payload['mimeType'] == 'text/plain':
                 data = payload['body']['data']
-                body = base64.urlsafe_b64decode(data).decode('utf-8')
+                body = _decode_body_data(data).decode('utf-8', errors='replace')
         
         return body.strip()
     
@@ -165,75 +544,43 @@ class GmailAssistant:
         if not self.vertex_model:
             return self._analyze_email_fallback(email_data)
         
+        cached = get_analysis_cache().get(email_data['id'])
+        if cached is not None:
+            return cached
+        
         try:
-            # Prepare email content for analysis
-            email_content = f"""
-            EMAIL ANALYSIS REQUEST:
-            
-            From: {email_data['sender']}
-            Subject: {email_data['subject']}
-            Date: {email_data['date']}
-            Body: {email_data['body'][:1500]}
-            Snippet: {email_data['snippet']}
-            Gmail Labels: {', '.join(email_data['labels'])}
-            
-            Please analyze this email and provide an importance score and reasoning.
-            
-            ANALYSIS CRITERIA:
-            - Sender reputation and relationship (personal vs automated)
-            - Subject urgency and keywords
-            - Content urgency and action items
-            - Professional vs personal context
-            - Time sensitivity
-            - Financial or legal implications
-            
-            RESPONSE FORMAT (JSON only):
-            {{
-                "importance_score": <number 0-100>,
-                "importance_level": "<HIGH|MEDIUM|LOW>",
-                "reasoning": [
-                    "Primary reason for this score",
-                    "Secondary reason",
-                    "Additional context"
-                ],
-                "urgency_indicators": [
-                    "List any urgent keywords or phrases found"
-                ],
-                "action_required": <true|false>,
-                "estimated_response_time": "<IMMEDIATE|WITHIN_HOUR|WITHIN_DAY|WHEN_CONVENIENT>"
-            }}
-            
-            Score Guidelines:
-            - 80-100: Critical/Urgent (HIGH) - Immediate attention required
-            - 50-79: Important (MEDIUM) - Should respond within hours
-            - 20-49: Routine (LOW) - Can wait 1-2 days  
-            - 0-19: Low priority (LOW) - Can wait or ignore
-            """
+            # Only the email itself is sent per call; the criteria live in the system instruction
+            email_content = EMAIL_PROMPT_TEMPLATE % (
+                email_data['sender'],
+                email_data['subject'],
+                email_data['date'],
+                email_data['body'][:1500],
+                email_data['snippet'],
+                ', '.join(email_data['labels'])
+            )
             
-            response = self.vertex_model.generate_content(email_content)
+            # Stream the reply and stop reading as soon as the JSON object is complete
+            response_text = ""
+            json_text = None
+            for chunk in self.vertex_model.generate_content(
+                email_content, generation_config=ANALYSIS_CONFIG, stream=True
+            ):
+                response_text += chunk.text
+                json_text = _first_json_object(response_text)
+                if json_text is not None:
+                    break
             
-            # Try to parse JSON response
+            # The response schema guarantees the required fields
             try:
-                response_text = response.text
-                json_start = response_text.find('{')
-                json_end = response_text.rfind('}') + 1
-                
-                if json_start != -1 and json_end != -1:
-                    json_text = response_text[json_start:json_end]
-                    analysis = json.loads(json_text)
-                    
-                    # Validate required fields
-                    required_fields = ['importance_score', 'importance_level', 'reasoning']
-                    if all(field in analysis for field in required_fields):
-                        return analysis
-                    else:
-                        print(f"⚠️  Incomplete AI response, using fallback for email {email_data['id']}")
-                        return self._analyze_email_fallback(email_data)
+                if json_text is not None:
+                    analysis = orjson.loads(json_text)
+                    get_analysis_cache().put(email_data['id'], analysis)
+                    return analysis
                 else:
                     print(f"⚠️  No JSON found in AI response, using fallback for email {email_data['id']}")
                     return self._analyze_email_fallback(email_data)
                     
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 print(f"⚠️  JSON parsing error: {e}, using fallback for email {email_data['id']}")
                 return self._analyze_email_fallback(email_data)
                 
@@ -241,6 +588,78 @@ class GmailAssistant:
             print(f"⚠️  Vertex AI error: {e}, using fallback for email {email_data['id']}")
             return self._analyze_email_fallback(email_data)
     
+    def analyze_emails_batch(self, emails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Analyze several emails with one Gemini call per group of AI_BATCH_SIZE.
+        
+        Groups are sent concurrently, so latency is roughly one Gemini round trip.
+        
+        Args:
+            emails: Email detail dictionaries
+            
+        Returns:
+            Analysis results in the same order as emails
+        """
+        if not self.vertex_model:
+            return [self._analyze_email_fallback(email_data) for email_data in emails]
+        
+        cache = get_analysis_cache()
+        by_id = {}
+        for email_data in emails:
+            cached = cache.get(email_data['id'])
+            if cached is not None:
+                by_id[email_data['id']] = cached
+        
+        uncached = [email_data for email_data in emails if email_data['id'] not in by_id]
+        groups = [uncached[start:start + AI_BATCH_SIZE] for start in range(0, len(uncached), AI_BATCH_SIZE)]
+        for group_results in _AI_POOL.map(self._analyze_email_group, groups):
+            for msg_id, analysis in group_results.items():
+                cache.put(msg_id, analysis)
+                by_id[msg_id] = analysis
+        
+        # Anything the batched reply missed gets its own call
+        missed = [email_data for email_data in emails if email_data['id'] not in by_id]
+        for email_data, analysis in zip(missed, _AI_POOL.map(self.analyze_email_with_ai, missed)):
+            by_id[email_data['id']] = analysis
+        return [by_id[email_data['id']] for email_data in emails]
+    
+    def _analyze_email_group(self, emails: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """Run one Gemini call over a group of emails; returns valid analyses keyed by email ID."""
+        payload = [
+            {
+                'id': email_data['id'],
+                'from': email_data['sender'],
+                'subject': email_data['subject'],
+                'date': email_data['date'],
+                'body': email_data['body'][:1500],
+                'snippet': email_data['snippet'],
+                'labels': email_data['labels']
+            }
+            for email_data in emails
+        ]
+        email_content = (
+            f"Analyze each of these {len(emails)} emails independently. Return only a JSON array "
+            "with one object per email in the response format, plus an \"id\" field copied from the email.\n\n"
+            + orjson.dumps(payload).decode()
+        )
+        
+        try:
+            response = self.vertex_model.generate_content(email_content, generation_config=ANALYSIS_BATCH_CONFIG)
+            results = orjson.loads(response.text)
+        except Exception as e:
+            print(f"⚠️  Batched Vertex AI analysis failed: {e}, analyzing emails one by one")
+            return {}
+        
+        # Only IDs from this group that came back exactly once: a mistyped or repeated ID would
+        # cache an analysis under the wrong message. Emails left out are analyzed one by one by the caller
+        wanted = {email_data['id'] for email_data in emails}
+        id_counts = Counter(analysis.get('id') for analysis in results)
+        return {
+            analysis.pop('id'): analysis
+            for analysis in results
+            if analysis.get('id') in wanted and id_counts[analysis['id']] == 1
+        }
+    
     def _analyze_email_fallback(self, email_data: Dict[str, Any]) -> Dict[str, Any]:
         """Fallback analysis when AI is unavailable."""
         importance_score = 0
@@ -249,16 +668,13 @@ class GmailAssistant:
         sender_email = self._extract_email_from_sender(email_data['sender'])
         
         # Check for automated emails
-        if 'noreply' not in sender_email.lower() and 'no-reply' not in sender_email.lower():
+        if not _AUTOMATED_SENDER_RE.search(sender_email):
             importance_score += 20
             reasons.append("Personal email (not automated)")
         
-        # Subject keywords
-        urgent_keywords = ['urgent', 'asap', 'important', 'deadline', 'action required', 
-                          'invoice', 'payment', 'security', 'verify', 'expire']
-        
-        subject_lower = email_data['subject'].lower()
-        urgent_found = [keyword for keyword in urgent_keywords if keyword in subject_lower]
+        # Subject keywords, found in one scan and reported in URGENT_KEYWORDS order
+        matched = _find_urgent_keywords(email_data['subject'].lower())
+        urgent_found = [keyword for keyword in URGENT_KEYWORDS if keyword in matched]
         if urgent_found:
             importance_score += 30
             reasons.append(f"Urgent keywords: {', '.join(urgent_found)}")
@@ -291,10 +707,7 @@ class GmailAssistant:
     
     def _extract_email_from_sender(self, sender: str) -> str:
         """Extract email address from sender string."""
-        match = re.search(r'<([^>]+)>', sender)
-        if match:
-            return match.group(1)
-        return sender
+        return _sender_address(sender)
     
     def get_inbox_messages(self, max_results: int = 10, label_ids: List[str] = None) -> List[Dict[str, str]]:
         """
@@ -315,19 +728,75 @@ class GmailAssistant:
                 userId="me", 
                 maxResults=max_results,
                 labelIds=label_ids
-            ).execute()
+            ).execute(http=self._thread_http())
             
             return results.get('messages', [])
         except HttpError as error:
             print(f"❌ Error retrieving messages: {error}")
             return []
     
-    def analyze_inbox(self, max_emails: int = 5) -> List[Dict[str, Any]]:
+    def get_inbox_details(self, msg_ids: List[str], format: str = 'full') -> List[Dict[str, Any]]:
+        """
+        Get message details, fetching only messages that are new or changed since the last call.
+        
+        Args:
+            msg_ids: Gmail message IDs
+            format: 'full' for headers and body, 'metadata' for headers only
+            
+        Returns:
+            List of email detail dictionaries in msg_ids order
+        """
+        with self._message_cache_lock:
+            self._sync_message_cache()
+            
+            missing = [
+                msg_id for msg_id in msg_ids
+                if msg_id not in self._message_cache
+                or (format == 'full' and self._message_cache[msg_id]['body'] is None)
+            ]
+            if missing:
+                for email_data in self.get_messages_details_batch(missing, format=format):
+                    self._message_cache[email_data['id']] = email_data
+            
+            return [self._message_cache[msg_id] for msg_id in msg_ids if msg_id in self._message_cache]
+    
+    def _sync_message_cache(self) -> None:
+        """Drop cached details for messages that changed since the stored historyId; caller holds _message_cache_lock."""
+        try:
+            if self._last_history_id is None:
+                self._message_cache.clear()
+                profile = self.gmail_service.users().getProfile(userId="me").execute(http=self._thread_http())
+                self._last_history_id = profile['historyId']
+                return
+            
+            page_token = None
+            while True:
+                response = self.gmail_service.users().history().list(
+                    userId="me",
+                    startHistoryId=self._last_history_id,
+                    pageToken=page_token
+                ).execute(http=self._thread_http())
+                for record in response.get('history', []):
+                    for message in record.get('messages', []):
+                        self._message_cache.pop(message['id'], None)
+                page_token = response.get('nextPageToken')
+                if not page_token:
+                    break
+            self._last_history_id = response.get('historyId', self._last_history_id)
+        except HttpError as error:
+            # History IDs expire after about a week; start over with a full fetch
+            print(f"⚠️  History sync failed: {error}, refetching all messages")
+            self._message_cache.clear()
+            self._last_history_id = None
+    
+    def analyze_inbox(self, max_emails: int = 5, include_bodies: bool = True) -> List[Dict[str, Any]]:
         """
         Analyze importance of emails in inbox.
         
         Args:
             max_emails: Maximum number of emails to analyze
+            include_bodies: Fetch message bodies even when the analysis does not need them;
+                callers that download bodies on demand pass False and get 'body': None
             
         Returns:
             List of email analysis results
@@ -348,21 +817,26 @@ class GmailAssistant:
         
         analysis_results = []
         
-        for i, msg in enumerate(messages, 1):
-            email_data = self.get_message_details(msg['id'])
-            if email_data:
-                print(f"\n📧 Analyzing email {i}/{len(messages)}...")
-                analysis = self.analyze_email_with_ai(email_data)
-                
-                # Combine email data with analysis
-                result = {
-                    **email_data,
-                    'analysis': analysis
-                }
-                analysis_results.append(result)
-                
-                # Display results
-                self._display_analysis_result(email_data, analysis)
+        # Fetch new or changed message details in batched round trips; the rest are reused.
+        # Only the Gemini prompt reads bodies; rule-based analysis needs headers and labels.
+        emails = self.get_inbox_details(
+            [msg['id'] for msg in messages],
+            format='full' if self.vertex_model or include_bodies else 'metadata'
+        )
+        
+        print(f"\n📧 Analyzing {len(emails)} emails...")
+        analyses = self.analyze_emails_batch(emails)
+        
+        for email_data, analysis in zip(emails, analyses):
+            # Combine email data with analysis
+            result = {
+                **email_data,
+                'analysis': analysis
+            }
+            analysis_results.append(result)
+            
+            # Display results
+            self._display_analysis_result(email_data, analysis)
         
         return analysis_results
     
@@ -415,14 +889,12 @@ def main():
         
         # Summary
         if results:
-            high_priority = len([r for r in results if r['analysis']['importance_level'] == 'HIGH'])
-            medium_priority = len([r for r in results if r['analysis']['importance_level'] == 'MEDIUM'])
-            low_priority = len([r for r in results if r['analysis']['importance_level'] == 'LOW'])
+            levels = count_importance_levels(results)
             
             print(f"\n📊 SUMMARY:")
-            print(f"🔴 High Priority: {high_priority}")
-            print(f"🟡 Medium Priority: {medium_priority}")
-            print(f"🟢 Low Priority: {low_priority}")
+            print(f"🔴 High Priority: {levels['HIGH']}")
+            print(f"🟡 Medium Priority: {levels['MEDIUM']}")
+            print(f"🟢 Low Priority: {levels['LOW']}")
             print(f"📧 Total Analyzed: {len(results)}")
         
     except Exception as e:
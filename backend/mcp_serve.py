@@ -1,9 +1,14 @@
 from fastmcp import FastMCP
-from main import GmailAssistant
+from main import GmailAssistant, count_importance_levels
 import json
-from typing import List, Dict, Any
+import asyncio
+import os
+import time
+from collections import Counter, OrderedDict
+from typing import List, Dict, Any, Final
 import logging
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
 import uvicorn
 
@@ -12,21 +17,49 @@ logger = logging.getLogger(__name__)
 # Create MCP server instance
 mcp = FastMCP("Gmail Assistant MCP Server")
 
-# Create FastAPI app for HTTP interface
-app = FastAPI(title="MCP HTTP Interface")
+# Create FastAPI app for HTTP interface; responses are encoded with orjson
+app = FastAPI(title="MCP HTTP Interface", default_response_class=ORJSONResponse)
 
-# Global storage for user sessions (in production, use Redis or database)
-user_sessions = {}
+# Upper bound on how many emails one get_emails call analyzes
+MAX_EMAILS = 25
+
+# Characters of an email body read aloud by read_full_current_email
+VOICE_BODY_LIMIT = 1200
+
+# Spoken form of each importance level
+IMPORTANCE_TEXT: Final[Dict[str, str]] = {
+    "HIGH": "high priority",
+    "MEDIUM": "medium priority",
+    "LOW": "low priority"
+}
+
+# Global storage for user sessions (in production, use Redis or database).
+# Least recently used sessions are evicted past MAX_SESSIONS, except users mid tool call
+# and sessions used within SESSION_IDLE_TTL, which may belong to a call still in progress.
+# Both defaults match the voice server's MAX_CALL_SESSIONS and CALL_SESSION_TTL.
+MAX_SESSIONS = int(os.getenv("MCP_MAX_SESSIONS", "1000"))
+SESSION_IDLE_TTL = float(os.getenv("CALL_SESSION_TTL", "1800"))
+user_sessions: "OrderedDict[str, UserSession]" = OrderedDict()
+_busy_users: Counter = Counter()
 
 class UserSession:
     """User session management for MCP tools"""
     
+    # Sessions are kept for many users; slots drop the per-instance __dict__
+    __slots__ = ("user_id", "gmail_assistant", "gmail_emails", "current_email_index", "lock", "body_tasks",
+                 "last_used")
+    
     def __init__(self, user_id: str):
         self.user_id = user_id
         self.gmail_assistant = None
         self.gmail_emails = None
         self.current_email_index = 0
-        logger.info(f"📧 User session created for: {user_id}")
+        # Serializes credential setup and inbox loads for this user
+        self.lock = asyncio.Lock()
+        # In-flight body downloads by message ID, shared by prefetches and reads
+        self.body_tasks: Dict[str, asyncio.Task] = {}
+        self.last_used = time.monotonic()
+        logger.info("📧 User session created for: %s", user_id)
 
 class ToolCallRequest(BaseModel):
     """Request model for tool calls"""
@@ -38,88 +71,123 @@ class ToolCallResponse(BaseModel):
     result: str
     success: bool = True
 
+# Typed arguments per tool, validated once by pydantic-core
+class UserArgs(BaseModel):
+    user_id: str
+
+class EmailListArgs(UserArgs):
+    max_emails: int = 5
+
+class FetchEmailBodyArgs(UserArgs):
+    msg_id: str
+
+class SendEmailReplyArgs(UserArgs):
+    recipient: str
+    subject: str
+    body: str
+
+class CalendarArgs(UserArgs):
+    days: int = 7
+
+class CreateTaskArgs(UserArgs):
+    title: str
+    description: str = ""
+
 def get_user_session(user_id: str) -> UserSession:
     """Get or create user session"""
-    if user_id not in user_sessions:
-        user_sessions[user_id] = UserSession(user_id)
-    return user_sessions[user_id]
+    if user_id in user_sessions:
+        user_sessions.move_to_end(user_id)
+        session = user_sessions[user_id]
+        session.last_used = time.monotonic()
+        return session
+    session = user_sessions[user_id] = UserSession(user_id)
+    _evict_idle_sessions()
+    return session
+
+def _evict_idle_sessions() -> None:
+    """Drop least recently used sessions until there are at most MAX_SESSIONS"""
+    cutoff = time.monotonic() - SESSION_IDLE_TTL
+    # The newest session is the one being handed out, so it is never a candidate
+    for user_id in list(user_sessions)[:-1]:
+        # Oldest first, so every session from here on was used more recently
+        if len(user_sessions) <= MAX_SESSIONS or user_sessions[user_id].last_used > cutoff:
+            break
+        if _busy_users[user_id]:
+            continue
+        del user_sessions[user_id]
+        logger.info("🧹 Evicted idle session for: %s", user_id)
 
 # HTTP endpoint for tool calls
 @app.post("/call-tool", response_model=ToolCallResponse)
 async def call_tool_http(request: ToolCallRequest):
     """HTTP endpoint to call MCP tools"""
+    return await run_tool_call(request)
+
+async def run_tool_call(request: ToolCallRequest) -> ToolCallResponse:
+    """Route one tool call to its implementation"""
+    user_id = request.arguments.get("user_id")
+    _busy_users[user_id] += 1
     try:
         tool_name = request.tool
-        args = request.arguments
-        
-        # Route to appropriate tool function
-        if tool_name == "initialize_creds":
-            result = await initialize_creds_impl(args.get("user_id"))
-        elif tool_name == "get_emails":
-            result = await get_emails_impl(args.get("user_id"), args.get("max_emails", 5))
-        elif tool_name == "get_current_email_for_reading":
-            result = await get_current_email_for_reading_impl(args.get("user_id"))
-        elif tool_name == "read_full_current_email":
-            result = await read_full_current_email_impl(args.get("user_id"))
-        elif tool_name == "next_email":
-            result = await next_email_impl(args.get("user_id"))
-        elif tool_name == "send_email_reply":
-            result = await send_email_reply_impl(
-                args.get("user_id"),
-                args.get("recipient"),
-                args.get("subject"),
-                args.get("body")
-            )
-        elif tool_name == "get_calendar_events":
-            result = await get_calendar_events_impl(args.get("user_id"), args.get("days", 7))
-        elif tool_name == "create_task":
-            result = await create_task_impl(
-                args.get("user_id"),
-                args.get("title"),
-                args.get("description", "")
-            )
-        else:
+        if tool_name not in TOOL_REGISTRY:
             raise HTTPException(status_code=400, detail=f"Unknown tool: {tool_name}")
         
+        # Route to appropriate tool function; argument fields match its parameters
+        impl, args_model = TOOL_REGISTRY[tool_name]
+        result = await impl(**dict(args_model.model_validate(request.arguments)))
+        
         return ToolCallResponse(result=result, success=True)
     
     except Exception as e:
-        logger.error(f"Error calling tool {request.tool}: {e}")
-        logger.exception("Full exception details:")
+        logger.error("Error calling tool %s: %s", request.tool, e)
+        logger.debug("Full exception details:", exc_info=True)
         return ToolCallResponse(result=f"Error: {str(e)}", success=False)
+    finally:
+        _busy_users[user_id] -= 1
+        if not _busy_users[user_id]:
+            del _busy_users[user_id]
 
 # Tool implementation functions
 async def initialize_creds_impl(user_id: str) -> str:
     """Initialize Gmail credentials for a user"""
     try:
-        logger.info(f"🔐 Initializing Gmail credentials for user {user_id}")
+        logger.info("🔐 Initializing Gmail credentials for user %s", user_id)
         session = get_user_session(user_id)
-        session.gmail_assistant = GmailAssistant()
-        logger.info(f"✅ Gmail credentials initialized successfully for user {user_id}")
+        async with session.lock:
+            # Reuse an existing assistant so its message cache survives re-initialization
+            if not session.gmail_assistant:
+                # OAuth and client setup block, so keep them off the event loop
+                session.gmail_assistant = await asyncio.to_thread(GmailAssistant)
+        logger.info("✅ Gmail credentials initialized successfully for user %s", user_id)
         return f"✅ Gmail credentials initialized successfully for user {user_id}"
     except Exception as e:
         error_msg = f"❌ Error initializing credentials for user {user_id}: {str(e)}"
         logger.error(error_msg)
-        logger.exception("Full exception details:")
+        logger.debug("Full exception details:", exc_info=True)
         return error_msg
 
 async def get_emails_impl(user_id: str, max_emails: int = 5) -> str:
     """Get and analyze emails for a user"""
     try:
-        logger.info(f"📧 Getting emails for user {user_id}, max_emails={max_emails}")
+        max_emails = min(max_emails, MAX_EMAILS)
+        logger.info("📧 Getting emails for user %s, max_emails=%s", user_id, max_emails)
         session = get_user_session(user_id)
         
-        if not session.gmail_assistant:
-            error_msg = "❌ Please initialize credentials first"
-            logger.error(error_msg)
-            return error_msg
-        
-        # Get analyzed emails using GmailAssistant
-        logger.info(f"🔍 Analyzing inbox for user {user_id}")
-        analyzed_emails = session.gmail_assistant.analyze_inbox(max_emails=max_emails)
+        async with session.lock:
+            if not session.gmail_assistant:
+                error_msg = "❌ Please initialize credentials first"
+                logger.error(error_msg)
+                return error_msg
+            
+            # Get analyzed emails using GmailAssistant; Gmail and Gemini calls block, so run off the loop
+            logger.info("🔍 Analyzing inbox for user %s", user_id)
+            # Bodies are downloaded when an email is read, see _get_email_body
+            analyzed_emails = await asyncio.to_thread(
+                session.gmail_assistant.analyze_inbox, max_emails=max_emails, include_bodies=False
+            )
         
         if not analyzed_emails:
-            logger.info(f"📭 No emails found for user {user_id}")
+            logger.info("📭 No emails found for user %s", user_id)
             return "📭 No emails found in your inbox."
         
         # Store emails for this user session
@@ -127,24 +195,49 @@ async def get_emails_impl(user_id: str, max_emails: int = 5) -> str:
         session.current_email_index = 0
         
         # Create summary
-        high_priority = len([e for e in analyzed_emails if e['analysis']['importance_level'] == 'HIGH'])
-        medium_priority = len([e for e in analyzed_emails if e['analysis']['importance_level'] == 'MEDIUM'])
-        low_priority = len([e for e in analyzed_emails if e['analysis']['importance_level'] == 'LOW'])
+        counts = count_importance_levels(analyzed_emails)
         
-        summary = f"📧 Found {len(analyzed_emails)} emails: {high_priority} high priority, {medium_priority} medium priority, {low_priority} low priority"
-        logger.info(f"✅ Email analysis complete for user {user_id}: {summary}")
+        summary = f"📧 Found {len(analyzed_emails)} emails: {counts['HIGH']} high priority, {counts['MEDIUM']} medium priority, {counts['LOW']} low priority"
+        logger.info("✅ Email analysis complete for user %s: %s", user_id, summary)
         return summary
         
     except Exception as e:
         error_msg = f"❌ Error getting emails for user {user_id}: {str(e)}"
         logger.error(error_msg)
-        logger.exception("Full exception details:")
+        logger.debug("Full exception details:", exc_info=True)
         return error_msg
 
+async def start_email_session_impl(user_id: str, max_emails: int = 5) -> str:
+    """Initialize credentials and load the inbox in one call"""
+    cred_result = await initialize_creds_impl(user_id)
+    if cred_result.startswith("❌"):
+        return cred_result
+    return await get_emails_impl(user_id, max_emails)
+
+def _format_email_for_reading(session: UserSession, index: int) -> str:
+    """Format the email at index as its spoken subject-line presentation"""
+    email = session.gmail_emails[index]
+    # Each get_emails call stores fresh email dicts, so the memo never outlives its position
+    if 'voice_prompt' in email:
+        return email['voice_prompt']
+    position = f"{index + 1} of {len(session.gmail_emails)}"
+    
+    # Format for voice reading
+    importance_text = IMPORTANCE_TEXT.get(email['analysis']['importance_level'], "normal priority")
+    
+    # Clean sender for voice (remove email addresses in brackets)
+    sender = email["sender"].split('<')[0].strip()
+    if not sender:
+        sender = email["sender"]
+    
+    # Only read subject and ask if they want to continue
+    email['voice_prompt'] = f"Email {position}. This is a {importance_text} email from {sender}. Subject: {email['subject']}. Would you like me to read this email or skip to the next one?"
+    return email['voice_prompt']
+
 async def get_current_email_for_reading_impl(user_id: str) -> str:
     """Get current email subject and ask if user wants to read it"""
     try:
-        logger.info(f"🎤 Presenting email subject for user {user_id}")
+        logger.info("🎤 Presenting email subject for user %s", user_id)
         session = get_user_session(user_id)
         
         if not session.gmail_emails:
@@ -153,37 +246,94 @@ async def get_current_email_for_reading_impl(user_id: str) -> str:
         if session.current_email_index >= len(session.gmail_emails):
             return "Sorry, no more emails to read."
         
-        email = session.gmail_emails[session.current_email_index]
-        position = f"{session.current_email_index + 1} of {len(session.gmail_emails)}"
+        voice_text = _format_email_for_reading(session, session.current_email_index)
         
-        # Format for voice reading
-        importance_text = {
-            "HIGH": "high priority",
-            "MEDIUM": "medium priority", 
-            "LOW": "low priority"
-        }.get(email['analysis']['importance_level'], "normal priority")
+        logger.info("✅ Presented email subject for user %s", user_id)
+        return voice_text
         
-        # Clean sender for voice (remove email addresses in brackets)
-        sender = email["sender"].split('<')[0].strip()
-        if not sender:
-            sender = email["sender"]
+    except Exception as e:
+        error_msg = f"Error reading email: {str(e)}"
+        logger.error("❌ %s for user %s", error_msg, user_id)
+        logger.debug("Full exception details:", exc_info=True)
+        return error_msg
+
+async def peek_next_email_for_reading_impl(user_id: str) -> str:
+    """Get the next email's subject presentation without moving to it"""
+    try:
+        logger.info("👀 Peeking at next email for user %s", user_id)
+        session = get_user_session(user_id)
+        
+        if not session.gmail_emails:
+            return "Sorry, no emails loaded. Please get emails first."
         
-        # Only read subject and ask if they want to continue
-        voice_text = f"Email {position}. This is a {importance_text} email from {sender}. Subject: {email['subject']}. Would you like me to read this email or skip to the next one?"
+        next_index = session.current_email_index + 1
+        if next_index >= len(session.gmail_emails):
+            return "Sorry, no more emails to read."
         
-        logger.info(f"✅ Presented email subject for user {user_id}")
-        return voice_text
+        return _format_email_for_reading(session, next_index)
         
     except Exception as e:
         error_msg = f"Error reading email: {str(e)}"
-        logger.error(f"❌ {error_msg} for user {user_id}")
-        logger.exception("Full exception details:")
+        logger.error("❌ %s for user %s", error_msg, user_id)
+        logger.debug("Full exception details:", exc_info=True)
+        return error_msg
+
+async def _get_email_body(session: UserSession, email: Dict[str, Any]) -> str:
+    """Return an email's body, downloading it on first use if the listing did not include it"""
+    if email.get('body') is None:
+        await _start_body_fetch(session, email)
+    return email['body']
+
+def _start_body_fetch(session: UserSession, email: Dict[str, Any]) -> asyncio.Task:
+    """Start downloading an email's body, or return the download already in flight"""
+    task = session.body_tasks.get(email['id'])
+    if task is None:
+        task = session.body_tasks[email['id']] = asyncio.create_task(_load_email_body(session, email))
+    return task
+
+async def _load_email_body(session: UserSession, email: Dict[str, Any]) -> None:
+    """Download an email's body; on failure the body stays unset so the next read tries again"""
+    try:
+        email['body'] = await asyncio.to_thread(session.gmail_assistant.get_message_body, email['id'])
+    finally:
+        session.body_tasks.pop(email['id'], None)
+
+def _prefetch_email_bodies(session: UserSession, start: int, count: int = 2) -> None:
+    """Fetch upcoming bodies in the background while the current prompt is spoken"""
+    if not session.gmail_assistant:
+        return
+    for email in session.gmail_emails[start:start + count]:
+        if email.get('body') is None:
+            _start_body_fetch(session, email).add_done_callback(_log_prefetch_failure)
+
+def _log_prefetch_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("⚠️ Email body prefetch failed: %s", task.exception())
+
+async def fetch_email_body_impl(user_id: str, msg_id: str) -> str:
+    """Get the body text of one email, reusing the copy already held by the session"""
+    try:
+        logger.info("📄 Fetching body of email %s for user %s", msg_id, user_id)
+        session = get_user_session(user_id)
+        
+        if not session.gmail_assistant:
+            return "❌ Please initialize credentials first"
+        
+        for email in session.gmail_emails or []:
+            if email['id'] == msg_id:
+                return await _get_email_body(session, email)
+        return await asyncio.to_thread(session.gmail_assistant.get_message_body, msg_id)
+        
+    except Exception as e:
+        error_msg = f"Error fetching email body: {str(e)}"
+        logger.error("❌ %s for user %s", error_msg, user_id)
+        logger.debug("Full exception details:", exc_info=True)
         return error_msg
 
 async def read_full_current_email_impl(user_id: str) -> str:
     """Read the full content of the current email"""
     try:
-        logger.info(f"🎤 Reading full email content for user {user_id}")
+        logger.info("🎤 Reading full email content for user %s", user_id)
         session = get_user_session(user_id)
         
         if not session.gmail_emails:
@@ -194,53 +344,57 @@ async def read_full_current_email_impl(user_id: str) -> str:
         
         email = session.gmail_emails[session.current_email_index]
         
-        # Read the full email body
-        full_content = email['body'][:1200]  # Limit to reasonable length for voice
-        if len(email['body']) > 1200:
-            full_content += " ... email content continues. Say 'respond' to reply or 'next' for the next email."
-        else:
-            full_content += " Say 'respond' to reply to this email or 'next' for the next email."
+        # Built once per email so replays don't re-slice the body
+        if 'voice_body' not in email:
+            body = await _get_email_body(session, email)
+            if len(body) > VOICE_BODY_LIMIT:
+                email['voice_body'] = body[:VOICE_BODY_LIMIT] + " ... email content continues. Say 'respond' to reply or 'next' for the next email."
+            else:
+                email['voice_body'] = body + " Say 'respond' to reply to this email or 'next' for the next email."
         
-        logger.info(f"✅ Read full email content for user {user_id}")
-        return full_content
+        logger.info("✅ Read full email content for user %s", user_id)
+        return email['voice_body']
         
     except Exception as e:
         error_msg = f"Error reading full email: {str(e)}"
-        logger.error(f"❌ {error_msg} for user {user_id}")
-        logger.exception("Full exception details:")
+        logger.error("❌ %s for user %s", error_msg, user_id)
+        logger.debug("Full exception details:", exc_info=True)
         return error_msg
 
 async def next_email_impl(user_id: str) -> str:
     """Move to the next email for a user"""
     try:
-        logger.info(f"⏭️ Moving to next email for user {user_id}")
+        logger.info("⏭️ Moving to next email for user %s", user_id)
         session = get_user_session(user_id)
         
         if not session.gmail_emails:
             error_msg = "No emails loaded"
-            logger.error(f"❌ {error_msg} for user {user_id}")
+            logger.error("❌ %s for user %s", error_msg, user_id)
             return error_msg
         
         session.current_email_index += 1
         if session.current_email_index >= len(session.gmail_emails):
             msg = "No more emails to read"
-            logger.info(f"📭 {msg} for user {user_id}")
+            logger.info("📭 %s for user %s", msg, user_id)
             return msg
         
+        # The user usually asks for this email's body next, then the following one's
+        _prefetch_email_bodies(session, session.current_email_index)
+        
         result = f"Moved to email {session.current_email_index + 1} of {len(session.gmail_emails)}"
-        logger.info(f"✅ {result} for user {user_id}")
+        logger.info("✅ %s for user %s", result, user_id)
         return result
         
     except Exception as e:
         error_msg = f"Error moving to next email: {str(e)}"
-        logger.error(f"❌ {error_msg} for user {user_id}")
-        logger.exception("Full exception details:")
+        logger.error("❌ %s for user %s", error_msg, user_id)
+        logger.debug("Full exception details:", exc_info=True)
         return error_msg
 
 async def send_email_reply_impl(user_id: str, recipient: str, subject: str, body: str) -> str:
     """Send email reply from user's account"""
     try:
-        logger.info(f"📤 Sending email reply for user {user_id} to {recipient}")
+        logger.info("📤 Sending email reply for user %s to %s", user_id, recipient)
         session = get_user_session(user_id)
         
         if not session.gmail_assistant:
@@ -250,95 +404,122 @@ async def send_email_reply_impl(user_id: str, recipient: str, subject: str, body
         
         # TODO: Implement actual email sending via Gmail API
         result = f"✅ Email reply sent to {recipient} with subject: {subject}"
-        logger.info(f"✅ Email reply sent for user {user_id}")
+        logger.info("✅ Email reply sent for user %s", user_id)
         return result
         
     except Exception as e:
         error_msg = f"❌ Error sending email: {str(e)}"
-        logger.error(f"❌ {error_msg} for user {user_id}")
-        logger.exception("Full exception details:")
+        logger.error("❌ %s for user %s", error_msg, user_id)
+        logger.debug("Full exception details:", exc_info=True)
         return error_msg
 
 async def get_calendar_events_impl(user_id: str, days: int = 7) -> str:
     """Get calendar events for a user"""
     try:
-        logger.info(f"📅 Getting calendar events for user {user_id}")
+        logger.info("📅 Getting calendar events for user %s", user_id)
         # TODO: Implement calendar functionality
         result = f"📅 Calendar events retrieved for user {user_id} (next {days} days)"
-        logger.info(f"✅ Calendar events retrieved for user {user_id}")
+        logger.info("✅ Calendar events retrieved for user %s", user_id)
         return result
     except Exception as e:
         error_msg = f"❌ Error getting calendar events: {str(e)}"
-        logger.error(f"❌ {error_msg} for user {user_id}")
+        logger.error("❌ %s for user %s", error_msg, user_id)
         return error_msg
 
 async def create_task_impl(user_id: str, title: str, description: str = "") -> str:
     """Create task for a user"""
     try:
-        logger.info(f"✅ Creating task for user {user_id}: {title}")
+        logger.info("✅ Creating task for user %s: %s", user_id, title)
         # TODO: Implement task functionality
         result = f"✅ Task '{title}' created for user {user_id}"
-        logger.info(f"✅ Task created for user {user_id}")
+        logger.info("✅ Task created for user %s", user_id)
         return result
     except Exception as e:
         error_msg = f"❌ Error creating task: {str(e)}"
-        logger.error(f"❌ {error_msg} for user {user_id}")
+        logger.error("❌ %s for user %s", error_msg, user_id)
         return error_msg
 
+# Tool name -> (implementation, argument model)
+TOOL_REGISTRY = {
+    "initialize_creds": (initialize_creds_impl, UserArgs),
+    "start_email_session": (start_email_session_impl, EmailListArgs),
+    "get_emails": (get_emails_impl, EmailListArgs),
+    "get_current_email_for_reading": (get_current_email_for_reading_impl, UserArgs),
+    "peek_next_email_for_reading": (peek_next_email_for_reading_impl, UserArgs),
+    "read_full_current_email": (read_full_current_email_impl, UserArgs),
+    "fetch_email_body": (fetch_email_body_impl, FetchEmailBodyArgs),
+    "next_email": (next_email_impl, UserArgs),
+    "send_email_reply": (send_email_reply_impl, SendEmailReplyArgs),
+    "get_calendar_events": (get_calendar_events_impl, CalendarArgs),
+    "create_task": (create_task_impl, CreateTaskArgs),
+}
+
 # Keep the original MCP tools for FastMCP compatibility
 @mcp.tool
-def initialize_creds(user_id: str) -> str:
+async def initialize_creds(user_id: str) -> str:
     """Initialize Gmail credentials for a user"""
-    import asyncio
-    return asyncio.run(initialize_creds_impl(user_id))
+    return await initialize_creds_impl(user_id)
 
 @mcp.tool
-def get_emails(user_id: str, max_emails: int = 5) -> str:
+async def start_email_session(user_id: str, max_emails: int = 5) -> str:
+    """Initialize Gmail credentials and get analyzed emails for a user"""
+    return await start_email_session_impl(user_id, max_emails)
+
+@mcp.tool
+async def get_emails(user_id: str, max_emails: int = 5) -> str:
     """Get and analyze emails for a user"""
-    import asyncio
-    return asyncio.run(get_emails_impl(user_id, max_emails))
+    return await get_emails_impl(user_id, max_emails)
 
 @mcp.tool
-def get_current_email_for_reading(user_id: str) -> str:
+async def get_current_email_for_reading(user_id: str) -> str:
     """Get current email subject and ask if user wants to read it"""
-    import asyncio
-    return asyncio.run(get_current_email_for_reading_impl(user_id))
+    return await get_current_email_for_reading_impl(user_id)
+
+@mcp.tool
+async def peek_next_email_for_reading(user_id: str) -> str:
+    """Get the next email's subject presentation without moving to it"""
+    return await peek_next_email_for_reading_impl(user_id)
 
 @mcp.tool
-def read_full_current_email(user_id: str) -> str:
+async def read_full_current_email(user_id: str) -> str:
     """Read the full content of the current email"""
-    import asyncio
-    return asyncio.run(read_full_current_email_impl(user_id))
+    return await read_full_current_email_impl(user_id)
 
 @mcp.tool
-def next_email(user_id: str) -> str:
+async def fetch_email_body(user_id: str, msg_id: str) -> str:
+    """Get the body text of one email by message ID"""
+    return await fetch_email_body_impl(user_id, msg_id)
+
+@mcp.tool
+async def next_email(user_id: str) -> str:
     """Move to the next email for a user"""
-    import asyncio
-    return asyncio.run(next_email_impl(user_id))
+    return await next_email_impl(user_id)
 
 @mcp.tool
-def send_email_reply(user_id: str, recipient: str, subject: str, body: str) -> str:
+async def send_email_reply(user_id: str, recipient: str, subject: str, body: str) -> str:
     """Send email reply from user's account"""
-    import asyncio
-    return asyncio.run(send_email_reply_impl(user_id, recipient, subject, body))
+    return await send_email_reply_impl(user_id, recipient, subject, body)
 
 @mcp.tool
-def get_calendar_events(user_id: str, days: int = 7) -> str:
+async def get_calendar_events(user_id: str, days: int = 7) -> str:
     """Get calendar events for a user"""
-    import asyncio
-    return asyncio.run(get_calendar_events_impl(user_id, days))
+    return await get_calendar_events_impl(user_id, days)
 
 @mcp.tool
-def create_task(user_id: str, title: str, description: str = "") -> str:
+async def create_task(user_id: str, title: str, description: str = "") -> str:
     """Create task for a user"""
-    import asyncio
-    return asyncio.run(create_task_impl(user_id, title, description))
+    return await create_task_impl(user_id, title, description)
+
+# Liveness probes hit this constantly; the body never changes, so it is serialized once
+_HEALTH_BODY = b'{"status":"healthy","service":"mcp-http-server"}'
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "mcp-http-server"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 if __name__ == "__main__":
-    # Run the HTTP server for MCP tools
-    uvicorn.run(app, host="0.0.0.0", port=3000)
\ No newline at end of file
+    # Run the HTTP server for MCP tools. user_sessions is per-process, so extra
+    # workers need a load balancer that pins each user_id to one worker.
+    workers = int(os.getenv("MCP_WORKERS", "1"))
+    uvicorn.run("mcp_serve:app", host="0.0.0.0", port=3000, workers=workers, loop="auto", http="auto")
\ No newline at end of file
@@ -5,9 +5,16 @@ Test script for the Gmail Assistant Interactive Calling System
 
 import os
 import sys
+import asyncio
 from dotenv import load_dotenv
-from caller import make_interactive_call
+from caller import make_interactive_call, close_client
 import requests
+from requests.adapters import HTTPAdapter
+
+# One keep-alive connection pool for every HTTP check in a test run
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
 
 def check_environment():
     """Check if all required environment variables are set"""
@@ -34,11 +41,11 @@ def check_environment():
     print("✅ All required environment variables are set!")
     return True
 
-def check_server_running():
+def check_server_running(session: requests.Session = SESSION):
     """Check if the FastAPI server is running"""
     try:
         base_url = os.getenv('BASE_URL', 'http://localhost:8000')
-        response = requests.get(f"{base_url}/health", timeout=5)
+        response = session.get(f"{base_url}/health", timeout=5)
         if response.status_code == 200:
             print(f"✅ Server is running at {base_url}")
             return True
@@ -95,7 +102,13 @@ def test_call():
         print("⚠️  Using direct Twilio method (server not running)...")
     
     # Make the call
-    call_sid = make_interactive_call(phone_number, test_mode=test_mode)
+    async def run():
+        try:
+            return await make_interactive_call(phone_number, test_mode=test_mode)
+        finally:
+            await close_client()
+    
+    call_sid = asyncio.run(run())
     
     if call_sid:
         print(f"\n🎉 SUCCESS! Call initiated with SID: {call_sid}")
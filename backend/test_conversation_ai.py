@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Tests for ConversationAI's keyword intent routing
+"""
+
+import pytest
+from conversation_ai import _MODE_ROUTES, _match_intents
+
+def routed_handler(mode: str, user_speech: str) -> str:
+    """Name of the handler ConversationAI._dispatch picks for an utterance"""
+    pattern, routes, fallback = _MODE_ROUTES[mode]
+    intents = _match_intents(pattern, user_speech)
+    for intent, handler in routes:
+        if intent in intents:
+            return handler
+    return fallback
+
+@pytest.mark.parametrize("mode, user_speech, handler", [
+    ("email_reading", "I'm finished", "_stop_reading"),
+    ("email_reading", "keep reading", "_read_full_email"),
+    ("email_reading", "skipping this one", "_next_email"),
+    ("email_reading", "replying now", "_start_reply"),
+    ("email_reading", "Next please", "_next_email"),
+    ("general", "what are my todos", "_task_prompt"),
+    ("general", "any scheduled appointments", "_calendar_events"),
+    ("general", "thanks, bye", "_end_call"),
+    ("greeting", "check my emails", "_start_email_reading"),
+])
+def test_inflected_keywords_route_like_the_keyword(mode, user_speech, handler):
+    assert routed_handler(mode, user_speech) == handler
+
+@pytest.mark.parametrize("mode, user_speech", [
+    ("email_reading", "what is this about"),
+    ("general", "how is the weather"),
+])
+def test_unrelated_speech_falls_back(mode, user_speech):
+    assert routed_handler(mode, user_speech) == _MODE_ROUTES[mode][2]
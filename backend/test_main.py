@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for GmailAssistant's inbox analysis
+"""
+
+import pytest
+from main import GmailAssistant
+
+class RecordingAssistant(GmailAssistant):
+    """GmailAssistant with the Gmail API replaced by two canned messages"""
+
+    def __init__(self):
+        for initialize in ("_initialize_credentials", "_initialize_gmail_service", "_initialize_vertex_ai"):
+            setattr(self, initialize, lambda: None)
+        super().__init__()
+        self.requested_formats = []
+
+    def get_inbox_messages(self, max_results=10, label_ids=None):
+        return [{'id': 'm1'}, {'id': 'm2'}][:max_results]
+
+    def _sync_message_cache(self):
+        pass
+
+    def get_messages_details_batch(self, msg_ids, format='full'):
+        self.requested_formats.append(format)
+        return [
+            {
+                'id': msg_id,
+                'sender': 'Alice <alice@example.com>',
+                'subject': 'Quarterly report',
+                'date': 'Mon, 1 Jan 2024 09:00:00 +0000',
+                'snippet': 'Please review',
+                'labels': ['INBOX'],
+                'body': f'Body of {msg_id}' if format == 'full' else None
+            }
+            for msg_id in msg_ids
+        ]
+
+@pytest.fixture
+def assistant():
+    return RecordingAssistant()
+
+def test_rule_based_analysis_returns_bodies(assistant):
+    assert assistant.vertex_model is None
+
+    results = assistant.analyze_inbox(max_emails=2)
+
+    assert assistant.requested_formats == ['full']
+    assert [result['body'] for result in results] == ['Body of m1', 'Body of m2']
+    assert all('analysis' in result for result in results)
+
+def test_bodies_can_be_left_for_on_demand_download(assistant):
+    results = assistant.analyze_inbox(max_emails=2, include_bodies=False)
+
+    assert assistant.requested_formats == ['metadata']
+    assert [result['body'] for result in results] == [None, None]
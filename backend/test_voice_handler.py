@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Tests for the TwiML VoiceHandler builds from conversation replies
+"""
+
+import asyncio
+import pytest
+from conversation_ai import ACT_CONTINUE_READING
+from voice_handler import VoiceHandler
+
+LONG_BODY = " ".join(f"This is sentence number {n} of a fairly long email body." for n in range(20))
+
+class ScriptedConversation:
+    """Stands in for ConversationAI, answering every utterance with one fixed reply"""
+
+    def __init__(self, reply):
+        self.reply = reply
+
+    async def process_user_input(self, user_speech):
+        return self.reply
+
+@pytest.fixture
+def voice_handler(monkeypatch):
+    monkeypatch.setenv("TWILIO_ACCOUNT_SID", "ACtest")
+    monkeypatch.setenv("TWILIO_AUTH_TOKEN", "token")
+    monkeypatch.setenv("TWILIO_NUMBER", "+15550000000")
+    return VoiceHandler()
+
+def test_long_email_body_is_split_into_several_says(voice_handler):
+    voice_handler.conversation_sessions["CA1"] = ScriptedConversation(
+        {"response_text": LONG_BODY, "action": ACT_CONTINUE_READING, "tts_text": LONG_BODY}
+    )
+    voice_handler._last_access["CA1"] = 0.0
+
+    twiml = asyncio.run(voice_handler.process_user_input("CA1", "read it")).decode()
+
+    assert twiml.count("<Say") > 1
+    assert "sentence number 0 " in twiml and "sentence number 19 " in twiml
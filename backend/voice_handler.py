@@ -1,40 +1,249 @@
-from twilio.twiml.voice_response import VoiceResponse, Gather
+from twilio.twiml.voice_response import Gather, Say
 from twilio.rest import Client
-from fastapi import Request
-from conversation_ai import ConversationAI
+from twilio.http.http_client import TwilioHttpClient
+from requests.adapters import HTTPAdapter
+from conversation_ai import (
+    ConversationAI, close_mcp_client,
+    ACT_END_CALL, ACT_START_EMAIL_READING, ACT_READ_NEXT_EMAIL, ACT_CONTINUE_READING, ACT_WAIT_FOR_RESPONSE_CONTENT
+)
 import os
+import re
+import asyncio
+import time
+from collections import OrderedDict
+from functools import partial
+from xml.sax.saxutils import escape
 from dotenv import load_dotenv
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 
 load_dotenv('.env.local')
 
+# Sessions whose status callback never arrived are closed after this much inactivity
+SESSION_IDLE_TTL = float(os.getenv("CALL_SESSION_TTL", "1800"))
+_REAP_INTERVAL = 60.0
+# New calls beyond this many live sessions are turned away instead of growing memory without bound
+MAX_CALL_SESSIONS = int(os.getenv("MAX_CALL_SESSIONS", "1000"))
+
+# Finished calls are cleaned up in batches of up to this many, collected for at most _STATUS_BATCH_WAIT
+STATUS_BATCH_MAX = 50
+_STATUS_BATCH_WAIT = 0.05
+# Status callbacks that mean the call is over and its session can go
+_TERMINAL_CALL_STATUSES = frozenset({'completed', 'failed', 'busy', 'no-answer'})
+
+# Connections kept open to api.twilio.com; calls.create runs in worker threads, so size for those
+TWILIO_POOL_SIZE = 50
+
+def _pooled_twilio_http_client() -> TwilioHttpClient:
+    """Twilio HTTP client whose requests.Session reuses TCP+TLS connections across calls"""
+    http_client = TwilioHttpClient()
+    # urllib3 never retries read errors on POST, so retries cannot place the same call twice
+    http_client.session.mount("https://", HTTPAdapter(
+        pool_connections=TWILIO_POOL_SIZE, pool_maxsize=TWILIO_POOL_SIZE, max_retries=3
+    ))
+    return http_client
+
+TEST_TWIML_URL = "http://demo.twilio.com/docs/voice.xml"
+
+# TwiML is assembled from fragments serialized once at import; only spoken text
+# is escaped per request (the same escaping ElementTree applies to text nodes)
+def _verb_xml(verb) -> str:
+    """Serialize one TwiML verb without the XML declaration"""
+    return verb.to_xml(xml_declaration=False)
+
+def _say_xml(text: str) -> str:
+    """<Say> in the assistant's voice for dynamic text"""
+    return f'<Say voice="alice">{escape(text)}</Say>'
+
+# Long text is read as several <Say> verbs of about this many characters, so playback starts sooner
+SAY_CHUNK_CHARS = 150
+_SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+')
+
+def _say_chunks_xml(text: str) -> str:
+    """Consecutive <Say> verbs for long text, split on sentence boundaries"""
+    chunks = []
+    current = ""
+    for sentence in _SENTENCE_BREAK_RE.split(text):
+        if current and len(current) + len(sentence) + 1 > SAY_CHUNK_CHARS:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return "".join(_say_xml(chunk) for chunk in chunks)
+
+def _twiml(*fragments: str) -> bytes:
+    """Wrap fragments in a complete, encoded TwiML document (static ones are built once at import)"""
+    return ('<?xml version="1.0" encoding="UTF-8"?><Response>' + "".join(fragments) + "</Response>").encode()
+
+_GATHER_SPEECH_XML = _verb_xml(Gather(
+    input='speech',
+    action='/voice/process_input',
+    method='POST',
+    speech_timeout='auto',
+    language='en-US'
+))
+_HANGUP_XML = "<Hangup />"
+_REDIRECT_GREETING_XML = "<Redirect>/voice/greeting</Redirect>"
+_REDIRECT_PROCESS_INPUT_XML = "<Redirect>/voice/process_input</Redirect>"
+_REDIRECT_READ_EMAIL_XML = "<Redirect>/voice/read_email</Redirect>"
+_HELP_ELSE_XML = _say_xml("How else can I help you?")
+_NO_RESPONSE_HEARD_XML = _say_xml("I didn't hear your response. What would you like me to say?")
+_READING_OPTIONS_XML = _say_xml("Say 'respond' to reply, 'next' for the next email, or 'stop' to finish.")
+
+def _say_gather_reply(say: str, fallback: str = _HELP_ELSE_XML, redirect: str = _REDIRECT_PROCESS_INPUT_XML) -> bytes:
+    """Speak, listen for the answer, and if nothing is heard speak the fallback and redirect"""
+    return _twiml(say, _GATHER_SPEECH_XML, fallback, redirect)
+
+def _say_then_read_email(say: str) -> bytes:
+    return _twiml(say, _REDIRECT_READ_EMAIL_XML)
+
+# TwiML around the spoken reply for each conversation action (end_call is handled separately,
+# anything not listed, e.g. continue, gets the default _say_gather_reply)
+_READ_EMAIL_ACTIONS = frozenset({ACT_START_EMAIL_READING, ACT_READ_NEXT_EMAIL, ACT_CONTINUE_READING})
+_ACTION_REPLIES = {
+    **{action: _say_then_read_email for action in _READ_EMAIL_ACTIONS},
+    ACT_WAIT_FOR_RESPONSE_CONTENT: partial(_say_gather_reply, fallback=_NO_RESPONSE_HEARD_XML),
+}
+
+_GREETING_TWIML = _say_gather_reply(
+    _verb_xml(Say(
+        "Hello! I'm your personal email assistant. How can I help you today? "
+        "You can ask me to read your emails, check your calendar, or manage tasks.",
+        voice='alice',
+        language='en-US'
+    )),
+    _say_xml("I didn't hear anything. Please let me know how I can help you."),
+    _REDIRECT_GREETING_XML
+)
+_BUSY_TWIML = _twiml(_say_xml("We are experiencing high call volume. Please try again shortly."), _HANGUP_XML)
+_SESSION_LOST_TWIML = _twiml(_say_xml("I'm sorry, I lost our conversation. Let me restart."), _REDIRECT_GREETING_XML)
+_PROCESSING_ERROR_TWIML = _twiml(
+    _say_xml("I'm sorry, I encountered an error. Let me try again."), _REDIRECT_GREETING_XML
+)
+_NO_MORE_EMAILS_TWIML = _say_gather_reply(
+    _say_xml("No more emails to read. Is there anything else I can help you with?")
+)
+_READING_ERROR_TWIML = _twiml(
+    _say_xml("I had trouble reading that email. Let me try the next one."), _REDIRECT_PROCESS_INPUT_XML
+)
+
 class VoiceHandler:
     """Handles Twilio voice interactions and TwiML responses"""
     
     def __init__(self):
         self.twilio_client = Client(
             os.environ["TWILIO_ACCOUNT_SID"],
-            os.environ["TWILIO_AUTH_TOKEN"]
+            os.environ["TWILIO_AUTH_TOKEN"],
+            http_client=_pooled_twilio_http_client()
         )
-        self.conversation_sessions = {}  # Store conversation states per call
-        
-    def initiate_call(self, to_number: str, test_mode: bool = False) -> str:
+        # Store conversation states per call, least recently used first
+        self.conversation_sessions: "OrderedDict[str, ConversationAI]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._reaper_task: Optional[asyncio.Task] = None
+        # Finished CallSids waiting for cleanup; created on the loop, like the reaper
+        self._ended_calls: Optional[asyncio.Queue] = None
+        self._cleanup_task: Optional[asyncio.Task] = None
+        # Strong refs, the loop only keeps weak ones to running tasks
+        self._closing_tasks: set = set()
+        # Resolved once: changing BASE_URL or TWILIO_NUMBER needs a restart
+        self._from_number = os.environ["TWILIO_NUMBER"]
+        base_url = os.environ.get('BASE_URL', 'http://localhost:8000')
+        # Add ngrok-skip-browser-warning parameter for free ngrok accounts
+        if 'ngrok' in base_url:
+            self._greeting_url = f"{base_url}/voice/greeting?ngrok-skip-browser-warning=true"
+        else:
+            self._greeting_url = f"{base_url}/voice/greeting"
+    
+    def _get_session(self, call_sid: str) -> Optional[ConversationAI]:
+        """Look up a call's session and mark it as recently used"""
+        conversation_ai = self.conversation_sessions.get(call_sid)
+        if conversation_ai is not None:
+            self.conversation_sessions.move_to_end(call_sid)
+            self._last_access[call_sid] = time.monotonic()
+        return conversation_ai
+    
+    def _pop_session(self, call_sid: str) -> Optional[ConversationAI]:
+        """Remove a call's session from the store and return it"""
+        self._last_access.pop(call_sid, None)
+        return self.conversation_sessions.pop(call_sid, None)
+    
+    async def _close_session(self, call_sid: str, conversation_ai: ConversationAI) -> None:
+        """Properly close a session's async context manager"""
+        try:
+            await conversation_ai.__aexit__(None, None, None)
+        except Exception as e:
+            logging.error(f"Error closing ConversationAI session {call_sid}: {e}")
+    
+    def _ensure_reaper(self) -> None:
+        """Start the idle-session reaper on the running loop (the handler is built in a worker thread)"""
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.create_task(self._reap_idle_sessions())
+    
+    async def _reap_idle_sessions(self) -> None:
+        """Close sessions idle longer than SESSION_IDLE_TTL, e.g. after a missed status callback"""
+        while True:
+            await asyncio.sleep(_REAP_INTERVAL)
+            cutoff = time.monotonic() - SESSION_IDLE_TTL
+            expired = []
+            # Oldest first, so stop at the first session that is still fresh
+            for call_sid in self.conversation_sessions:
+                if self._last_access[call_sid] > cutoff:
+                    break
+                expired.append(call_sid)
+            for call_sid in expired:
+                logging.info(f"Closing idle session for call {call_sid}")
+            await asyncio.gather(*(self._close_session(call_sid, self._pop_session(call_sid)) for call_sid in expired))
+    
+    def _queue_cleanup(self, call_sid: str) -> None:
+        """Hand a finished call to the batch cleanup task, starting it if needed"""
+        if self._ended_calls is None:
+            self._ended_calls = asyncio.Queue()
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = asyncio.create_task(self._clean_up_ended_calls())
+        self._ended_calls.put_nowait(call_sid)
+    
+    async def _clean_up_ended_calls(self) -> None:
+        """Drain finished calls in batches and close their sessions together"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._ended_calls.get()]
+            deadline = loop.time() + _STATUS_BATCH_WAIT
+            while len(batch) < STATUS_BATCH_MAX:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._ended_calls.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._forget_sessions(batch)
+            logging.info(f"Cleaned up {len(batch)} ended call(s)")
+    
+    async def _forget_sessions(self, call_sids) -> None:
+        """Close several finished calls' sessions concurrently"""
+        # Popped up front, so webhooks arriving mid-close already see the calls as gone
+        popped = [(call_sid, self._pop_session(call_sid)) for call_sid in call_sids]
+        await asyncio.gather(*(self._close_session(call_sid, conversation_ai)
+                               for call_sid, conversation_ai in popped if conversation_ai is not None))
+    
+    def _close_in_background(self, coro) -> None:
+        """Run a session close without making the webhook wait; aclose() awaits stragglers"""
+        task = asyncio.create_task(coro)
+        self._closing_tasks.add(task)
+        task.add_done_callback(self._closing_tasks.discard)
+    
+    async def initiate_call(self, to_number: str, test_mode: bool = False) -> str:
         """Initiate an outbound call"""
         try:
-            if test_mode:
-                # For testing: use a simple TwiML that just says hello
-                twiml_url = "http://demo.twilio.com/docs/voice.xml"
-            else:
-                base_url = os.environ.get('BASE_URL', 'http://localhost:8000')
-                # Add ngrok-skip-browser-warning parameter for free ngrok accounts
-                if 'ngrok' in base_url:
-                    twiml_url = f"{base_url}/voice/greeting?ngrok-skip-browser-warning=true"
-                else:
-                    twiml_url = f"{base_url}/voice/greeting"
+            # For testing: use a simple TwiML that just says hello
+            twiml_url = TEST_TWIML_URL if test_mode else self._greeting_url
             
-            call = self.twilio_client.calls.create(
-                from_=os.environ["TWILIO_NUMBER"],
+            # The Twilio REST client is blocking, keep it off the event loop
+            call = await asyncio.to_thread(
+                self.twilio_client.calls.create,
+                from_=self._from_number,
                 to=to_number,
                 url=twiml_url,
                 method="POST"
@@ -45,198 +254,103 @@ class VoiceHandler:
             logging.error(f"Error initiating call: {e}")
             raise
     
-    async def handle_greeting(self, request: Request) -> str:
+    async def aclose(self) -> None:
+        """Close every open conversation session and the shared MCP pool"""
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+        if self._cleanup_task is not None:
+            self._cleanup_task.cancel()
+        # Calls that ended but weren't cleaned up yet
+        pending = []
+        while self._ended_calls is not None and not self._ended_calls.empty():
+            pending.append(self._ended_calls.get_nowait())
+        await self._forget_sessions(pending)
+        await asyncio.gather(*(self._close_session(call_sid, self._pop_session(call_sid))
+                               for call_sid in list(self.conversation_sessions)))
+        await asyncio.gather(*self._closing_tasks)
+        await close_mcp_client()
+    
+    async def handle_greeting(self, call_sid: str, caller_number: Optional[str]) -> bytes:
         """Handle initial call greeting"""
-        response = VoiceResponse()
-        
         # Get or create conversation session
-        form_data = await request.form()
-        call_sid = form_data.get('CallSid')
-        caller_number = form_data.get('From')
-        
-        if call_sid not in self.conversation_sessions:
+        self._ensure_reaper()
+        if self._get_session(call_sid) is None:
+            if len(self.conversation_sessions) >= MAX_CALL_SESSIONS:
+                # A normal 200 TwiML reply, so Twilio hangs up instead of retrying
+                logging.warning(f"Rejecting call {call_sid}: {len(self.conversation_sessions)} sessions open")
+                return _BUSY_TWIML
             # Note: ConversationAI is now an async context manager, but we'll manage it manually
             # in the voice handler since we need to persist sessions across requests
-            self.conversation_sessions[call_sid] = ConversationAI(user_id=caller_number)
-        
-        # Welcome message
-        response.say(
-            "Hello! I'm your personal email assistant. How can I help you today? "
-            "You can ask me to read your emails, check your calendar, or manage tasks.",
-            voice='alice',
-            language='en-US'
-        )
+            # Caller ID can be withheld; the CallSid then keys this call's MCP session
+            self.conversation_sessions[call_sid] = ConversationAI(user_id=caller_number or call_sid)
+            self._last_access[call_sid] = time.monotonic()
         
-        # Gather user input
-        gather = Gather(
-            input='speech',
-            action='/voice/process_input',
-            method='POST',
-            speech_timeout='auto',
-            language='en-US'
-        )
-        response.append(gather)
-        
-        # Fallback if no input
-        response.say("I didn't hear anything. Please let me know how I can help you.", voice='alice')
-        response.redirect('/voice/greeting')
-        
-        return str(response)
+        # Welcome message, gather user input, fallback if no input
+        return _GREETING_TWIML
     
-    async def process_user_input(self, request: Request) -> str:
+    async def process_user_input(self, call_sid: str, speech_result: str) -> bytes:
         """Process user speech input and generate appropriate response"""
-        response = VoiceResponse()
-        
-        form_data = await request.form()
-        call_sid = form_data.get('CallSid')
-        speech_result = form_data.get('SpeechResult', '')
-        
-        if call_sid not in self.conversation_sessions:
+        conversation_ai = self._get_session(call_sid)
+        if conversation_ai is None:
             # Session lost, restart
-            response.say("I'm sorry, I lost our conversation. Let me restart.", voice='alice')
-            response.redirect('/voice/greeting')
-            return str(response)
-        
-        conversation_ai = self.conversation_sessions[call_sid]
+            return _SESSION_LOST_TWIML
         
         try:
             # Process the user input with async call
             ai_response = await conversation_ai.process_user_input(speech_result)
+            # Full email bodies come through here; long replies are split into several <Say> verbs
+            say = _say_chunks_xml(ai_response["tts_text"])
             
             # Handle different actions
-            if ai_response["action"] == "end_call":
-                response.say(ai_response["tts_text"], voice='alice')
-                response.hangup()
-                # Clean up session
-                if call_sid in self.conversation_sessions:
-                    del self.conversation_sessions[call_sid]
-            
-            elif ai_response["action"] == "start_email_reading":
-                response.say(ai_response["tts_text"], voice='alice')
-                response.redirect('/voice/read_email')
-            
-            elif ai_response["action"] == "read_next_email":
-                response.say(ai_response["tts_text"], voice='alice')
-                response.redirect('/voice/read_email')
+            action = ai_response["action"]
+            if action == ACT_END_CALL:
+                # Clean up session; hang up right away, the close finishes in the background
+                self._close_in_background(self._forget_sessions([call_sid]))
+                return _twiml(say, _HANGUP_XML)
             
-            elif ai_response["action"] == "continue_reading":
-                response.say(ai_response["tts_text"], voice='alice')
-                response.redirect('/voice/read_email')
-            
-            elif ai_response["action"] == "wait_for_response_content":
-                response.say(ai_response["tts_text"], voice='alice')
-                
-                gather = Gather(
-                    input='speech',
-                    action='/voice/process_input',
-                    method='POST',
-                    speech_timeout='auto',
-                    language='en-US'
-                )
-                response.append(gather)
-                
-                response.say("I didn't hear your response. What would you like me to say?", voice='alice')
-                response.redirect('/voice/process_input')
-            
-            else:  # continue or other actions
-                response.say(ai_response["tts_text"], voice='alice')
-                
-                gather = Gather(
-                    input='speech',
-                    action='/voice/process_input',
-                    method='POST',
-                    speech_timeout='auto',
-                    language='en-US'
-                )
-                response.append(gather)
-                
-                response.say("How else can I help you?", voice='alice')
-                response.redirect('/voice/process_input')
+            # Everything else only differs in what follows the spoken reply
+            return _ACTION_REPLIES.get(action, _say_gather_reply)(say)
         
         except Exception as e:
             logging.error(f"Error processing user input: {e}")
             logging.exception("Full exception details:")
-            response.say("I'm sorry, I encountered an error. Let me try again.", voice='alice')
-            response.redirect('/voice/greeting')
-        
-        return str(response)
+            return _PROCESSING_ERROR_TWIML
     
-    async def read_current_email(self, request: Request) -> str:
+    async def read_current_email(self, call_sid: str) -> bytes:
         """Read the current email to the user"""
-        response = VoiceResponse()
-        
-        form_data = await request.form()
-        call_sid = form_data.get('CallSid')
-        
-        if call_sid not in self.conversation_sessions:
-            response.say("I'm sorry, I lost our conversation. Let me restart.", voice='alice')
-            response.redirect('/voice/greeting')
-            return str(response)
-        
-        conversation_ai = self.conversation_sessions[call_sid]
+        conversation_ai = self._get_session(call_sid)
+        if conversation_ai is None:
+            return _SESSION_LOST_TWIML
         
         try:
             # Get current email for reading with async call
             email_text = await conversation_ai.get_current_email_for_reading()
             
             if email_text:
-                # Read the email
-                response.say(email_text, voice='alice')
+                # Fetch the next email while this one is being read, so "next" answers immediately
+                conversation_ai.prefetch_next_email()
                 
-                # Wait for user input (respond, next, stop, etc.)
-                gather = Gather(
-                    input='speech',
-                    action='/voice/process_input',
-                    method='POST',
-                    speech_timeout='auto',
-                    language='en-US'
-                )
-                response.append(gather)
-                
-                # Fallback
-                response.say("Say 'respond' to reply, 'next' for the next email, or 'stop' to finish.", voice='alice')
-                response.redirect('/voice/read_email')
+                # Read the email, wait for user input (respond, next, stop, etc.), then fall back
+                return _say_gather_reply(_say_chunks_xml(email_text), _READING_OPTIONS_XML, _REDIRECT_READ_EMAIL_XML)
             else:
-                response.say("No more emails to read. Is there anything else I can help you with?", voice='alice')
-                
-                gather = Gather(
-                    input='speech',
-                    action='/voice/process_input',
-                    method='POST',
-                    speech_timeout='auto',
-                    language='en-US'
-                )
-                response.append(gather)
-                
-                response.say("How else can I help you?", voice='alice')
-                response.redirect('/voice/process_input')
+                return _NO_MORE_EMAILS_TWIML
         
         except Exception as e:
             logging.error(f"Error reading email: {e}")
             logging.exception("Full exception details:")
-            response.say("I had trouble reading that email. Let me try the next one.", voice='alice')
-            response.redirect('/voice/process_input')
-        
-        return str(response)
+            return _READING_ERROR_TWIML
     
-    async def handle_call_status(self, request: Request) -> str:
+    async def handle_call_status(self, call_sid: str, call_status: Optional[str]) -> str:
         """Handle call status updates"""
-        form_data = await request.form()
-        call_sid = form_data.get('CallSid')
-        call_status = form_data.get('CallStatus')
-        
         logging.info(f"Call {call_sid} status: {call_status}")
         
+        # Most callbacks (initiated, ringing, in-progress) have nothing to clean up
+        if call_status not in _TERMINAL_CALL_STATUSES:
+            return "OK"
+        
         # Clean up session when call ends
-        if call_status in ['completed', 'failed', 'busy', 'no-answer'] and call_sid in self.conversation_sessions:
-            conversation_ai = self.conversation_sessions[call_sid]
-            # Properly close the async context manager
-            try:
-                await conversation_ai.__aexit__(None, None, None)
-            except Exception as e:
-                logging.error(f"Error closing ConversationAI session: {e}")
-            
-            del self.conversation_sessions[call_sid]
-            logging.info(f"Cleaned up session for call {call_sid}")
+        if call_sid in self.conversation_sessions:
+            # Twilio only needs the 200 OK, the session is closed by the batch cleanup task
+            self._queue_cleanup(call_sid)
         
         return "OK" 
\ No newline at end of file